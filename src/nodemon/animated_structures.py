@@ -1,8 +1,14 @@
-from collections import defaultdict
+from collections import defaultdict, deque
 from heapq import heappush, heappop
-from random import choice
+from random import choice, sample
 
-from .structures import MatrixGraph
+from .structures import (
+    DisjointSet,
+    GraphProperties,
+    IndexedPriorityQueue,
+    MatrixGraph,
+    SparseMatrixGraph,
+)
 
 ###
 #
@@ -17,43 +23,17 @@ class AnimatedMatrixGraph(MatrixGraph):
     """
 
     def is_tree(self):
-        return (
-            self.undirected and self.__is_fully_connected() and not self.__is_cyclic()
-        )
-
-    def __is_fully_connected(self):
-        connected = True
-
-        if len(self) > 0:
-            nodes = sum([1 for node in self.breadth_first(self.nodes[0])]) - 1
-            # print(nodes, "vs", len(self))
-            connected = len(self) == nodes
-
-        return connected
-
-    def __is_cyclic(self):
-        cyclic = False
-
-        if len(self) > 0:
-            start_node = self.nodes[0]
-
-            visited = []
-            queue = [(start_node, None)]
-
-            while len(queue) > 0 and not cyclic:
-                current, previous = queue.pop(0)
-                visited.append(current)
+        return self.__properties().is_tree()
 
-                for node, weight in self.get_connections(current):
-                    if node not in visited:
-                        queue.append((node, current))
-                    elif node != previous:
-                        cyclic = True
+    def is_cyclic(self):
+        return self.__properties().is_cyclic()
 
-        return cyclic
+    def __properties(self):
+        """The GraphProperties of the graph as it stands, worked out afresh after each edit."""
+        return self._memoised(("properties",), lambda: GraphProperties(self))
 
     def depth_first(self, start_node, end_node=None):
-        if start_node in self.nodes:
+        if start_node in self:
             discovered = set([start_node])
             visited = []
             stack = [start_node]
@@ -69,7 +49,7 @@ class AnimatedMatrixGraph(MatrixGraph):
                     break
 
                 else:
-                    for node, weight in self.get_connections(current):
+                    for node, weight in self.neighbours(current):
                         if node not in discovered:
                             discovered.add(node)
                             stack.append(node)
@@ -79,15 +59,16 @@ class AnimatedMatrixGraph(MatrixGraph):
         return None
 
     def breadth_first(self, start_node, end_node=None):
-        if start_node in self.nodes:
+        # the queue is yielded as it stands, rather than copied each step, so is read-only
+        if start_node in self:
             discovered = set([start_node])
             visited = []
-            queue = [start_node]
+            queue = deque([start_node])
 
             yield (start_node, visited, queue)
 
             while len(queue) > 0:
-                current = queue.pop(0)
+                current = queue.popleft()
                 visited.append(current)
 
                 if current == end_node:
@@ -95,7 +76,7 @@ class AnimatedMatrixGraph(MatrixGraph):
                     break
 
                 else:
-                    for node, weight in self.get_connections(current):
+                    for node, weight in self.neighbours(current):
                         if node not in discovered:
                             discovered.add(node)
                             queue.append(node)
@@ -105,7 +86,8 @@ class AnimatedMatrixGraph(MatrixGraph):
         return None
 
     def pre_order(self, start_node, end_node=None):
-        if start_node in self.nodes:
+        if start_node in self:
+            tree = self.rooted_at(start_node)
             stack = []
             processed = []
             current = start_node
@@ -121,11 +103,7 @@ class AnimatedMatrixGraph(MatrixGraph):
                     processed.append(current)
 
                     # of any/all children, assume the first one is "left" and others are "right"
-                    children = [
-                        child
-                        for (child, _) in self.get_connections(current)
-                        if child not in processed
-                    ]
+                    children = list(tree.children(current))
                     if len(children) > 0:
                         current = children.pop(0)
                         stack += children[::-1]
@@ -139,10 +117,11 @@ class AnimatedMatrixGraph(MatrixGraph):
                     yield (current, processed, [])
 
     def in_order(self, start_node, end_node=None):
-        if start_node in self.nodes:
+        if start_node in self:
+            tree = self.rooted_at(start_node)
             stack = []
             processed = []
-            visited = []
+            visited = set()
             current = start_node
 
             yield (current, processed, [])
@@ -154,13 +133,11 @@ class AnimatedMatrixGraph(MatrixGraph):
 
                 if current is not None:
                     stack.append(current)
-                    visited.append(current)
+                    visited.add(current)
 
                     # of any/all children, assume the first one is "left" and others are "right"
                     children = [
-                        child
-                        for (child, _) in self.get_connections(current)
-                        if child not in visited
+                        child for child in tree.children(current) if child not in visited
                     ]
                     if len(children) > 0:
                         current = children.pop(0)
@@ -175,9 +152,7 @@ class AnimatedMatrixGraph(MatrixGraph):
 
                     # of any/all children, assume the first one is "left" and others are "right"
                     children = [
-                        child
-                        for (child, _) in self.get_connections(current)
-                        if child not in visited
+                        child for child in tree.children(current) if child not in visited
                     ]
                     if len(children) > 0:
                         current = children.pop(0)
@@ -188,10 +163,11 @@ class AnimatedMatrixGraph(MatrixGraph):
                     yield (current, processed, [])
 
     def post_order(self, start_node, end_node=None):
-        if start_node in self.nodes:
+        if start_node in self:
+            tree = self.rooted_at(start_node)
             stack = []
             processed = []
-            visited = []
+            visited = set()
             current = start_node
 
             yield (current, processed, [])
@@ -210,14 +186,10 @@ class AnimatedMatrixGraph(MatrixGraph):
 
                     else:
                         stack.append(current)
-                        visited.append(current)
+                        visited.add(current)
 
                         # of any/all children, assume the first one is "left" and others are "right"
-                        children = [
-                            child
-                            for (child, _) in self.get_connections(current)
-                            if child not in visited
-                        ]
+                        children = list(tree.children(current))
                         if len(children) > 0:
                             current = children.pop(0)
                             stack += children[::-1]
@@ -245,22 +217,37 @@ class AnimatedWeightedMatrixGraph(AnimatedMatrixGraph):
             weight (int, optional): Cost of travelling the edge. Defaults to 1.
             undirected (bool, optional): If True, will create the matching edge in reverse. Defaults to False.
         """
-        if from_node in self.nodes and to_node in self.nodes:
-            from_index = self.nodes.index(from_node)
-            to_index = self.nodes.index(to_node)
-            self.matrix[from_index][to_index] = weight
+        if from_node in self and to_node in self:
+            from_index = self._indices[from_node]
+            to_index = self._indices[to_node]
+            self._set_edge(from_index, to_index, weight)
             if (undirected is None and self.undirected) or (
                 undirected is not None and undirected
             ):
-                self.matrix[to_index][from_index] = weight
+                self._set_edge(to_index, from_index, weight)
+            self._mutated()
+
+    def add_edges_from(self, edges, undirected=None):
+        """
+        Adds (or updates) a whole batch of edges in one go; as with add_edge, edges with a
+        missing node are skipped
+
+        Args:
+            edges (iterable): (from_node, to_node, weight) tuples; the weight may be left off,
+                defaulting to 1
+            undirected (bool, optional): If True, will create the matching edges in reverse.
+                Defaults to the graph's own setting.
+        """
+        self._apply_edges(edges, self.undirected if undirected is None else undirected)
 
     def dijkstra(self, start_node, end_node=None):
         """
-        Implements the standard Dijkstra shortest path algorithm. If no end node is given, then all nodes are
-        exhaustively explored according to the rules of the algorithm; if an end node is provided then the algorithm
-        will end as soon as that node is encountered as the shortest path will have been found (as at each stage the
-        shortest unexplored path will have been chosen, as a heapq implementation is used to ensure time-efficient
-        ordering).
+        Implements the standard Dijkstra shortest path algorithm. If no end node is given, then
+        all nodes are exhaustively explored according to the rules of the algorithm; if an end
+        node is provided then the algorithm will end as soon as that node is encountered as the
+        shortest path will have been found (as at each stage the shortest unexplored path will
+        have been chosen, as an indexed priority queue is used to ensure time-efficient
+        ordering, each node being queued at most once).
 
         Args:
             start_node (string): node to be used as the starting point for the path finding
@@ -271,31 +258,32 @@ class AnimatedWeightedMatrixGraph(AnimatedMatrixGraph):
             the cost of travelling from the start node to that node (if no end node was given).
 
         Yields:
-            _type_: at the beginning of each iteration through the algorithm, a tuple containing the current node, the
-            state of visited nodes, and heapq of nodes to be processed.
+            _type_: at the beginning of each iteration through the algorithm, a tuple containing
+            the current node, the state of visited nodes, and an ordered list of the (cost,
+            node) pairs still to be processed.
         """
-        queue = []
+        queue = IndexedPriorityQueue()
         data = defaultdict(lambda: [float("inf"), None])
         data[start_node] = [0, None]
 
-        heappush(queue, (0, start_node))
-        yield start_node, data, queue
+        queue.push(start_node, 0)
+        yield start_node, data, queue.snapshot()
 
         while len(queue) > 0:
-            current_cost, current_node = heappop(queue)
+            current_cost, current_node = queue.pop()
 
             if current_node == end_node:
                 break
 
             else:
-                for neighbour, cost in self.get_connections(current_node):
+                for neighbour, cost in self.neighbours(current_node):
                     previous_cost, _ = data[neighbour]
                     if current_cost + cost < previous_cost:
                         data[neighbour][0] = current_cost + cost
                         data[neighbour][1] = current_node
-                        heappush(queue, (data[neighbour][0], neighbour))
+                        queue.push(neighbour, data[neighbour][0])
 
-                yield current_node, data, queue
+                yield current_node, data, queue.snapshot()
 
         if end_node is None:
             yield "", data, []
@@ -309,6 +297,91 @@ class AnimatedWeightedMatrixGraph(AnimatedMatrixGraph):
             path.append(current)
             yield "", data, path[::-1]
 
+    def bidirectional_dijkstra(self, start_node, end_node):
+        """
+        Implements Dijkstra's shortest path algorithm searching from both ends at once -
+        forwards from the start node and backwards, over the reversed edges, from the end node -
+        always growing the smaller frontier, and stopping as soon as the two frontiers can no
+        longer beat the best path found where they have met.
+
+        Args:
+            start_node (string): node to be used as the starting point for the path finding
+            end_node (string): node to be used as the end point for the path finding
+
+        Returns:
+            _type_: Path, in order from start to end node, or an empty list if the end node
+            can't be reached.
+
+        Yields:
+            _type_: at the beginning of each iteration through the algorithm, a tuple containing
+            the current node, the state of visited nodes from each end (as a pair of dicts,
+            forwards then backwards), and the ordered lists of (cost, node) pairs still to be
+            processed on each frontier (again as a pair, forwards then backwards).
+        """
+        forward = {start_node: [0, None]}  # node -> [cost from start, previous node]
+        backward = {end_node: [0, None]}  # node -> [cost to end, next node]
+        forward_queue = IndexedPriorityQueue()
+        forward_queue.push(start_node, 0)
+        backward_queue = IndexedPriorityQueue()
+        backward_queue.push(end_node, 0)
+
+        best, meeting = (0, start_node) if start_node == end_node else (float("inf"), None)
+
+        yield start_node, (forward, backward), (
+            forward_queue.snapshot(),
+            backward_queue.snapshot(),
+        )
+
+        while len(forward_queue) > 0 and len(backward_queue) > 0:
+            if forward_queue.peek()[0] + backward_queue.peek()[0] >= best:
+                break
+
+            if len(forward_queue) <= len(backward_queue):
+                queue, data, other, neighbours = (
+                    forward_queue,
+                    forward,
+                    backward,
+                    self.neighbours,
+                )
+            else:
+                queue, data, other, neighbours = (
+                    backward_queue,
+                    backward,
+                    forward,
+                    self.in_neighbours,
+                )
+
+            current_cost, current_node = queue.pop()
+            for neighbour, cost in neighbours(current_node):
+                if current_cost + cost < data.get(neighbour, (float("inf"),))[0]:
+                    data[neighbour] = [current_cost + cost, current_node]
+                    queue.push(neighbour, current_cost + cost)
+                if (
+                    neighbour in data
+                    and neighbour in other
+                    and data[neighbour][0] + other[neighbour][0] < best
+                ):
+                    best = data[neighbour][0] + other[neighbour][0]
+                    meeting = neighbour
+
+            yield current_node, (forward, backward), (
+                forward_queue.snapshot(),
+                backward_queue.snapshot(),
+            )
+
+        path = []
+        if meeting is not None:
+            current = meeting
+            while current is not None:
+                path.append(current)
+                current = forward[current][1]
+            path.reverse()
+            current = backward[meeting][1]
+            while current is not None:
+                path.append(current)
+                current = backward[current][1]
+        yield "", (forward, backward), path
+
     def astar(self, start_node, end_node, func):
         """
         Implements the standard A* shortest path algorithm. Nodes are explored according to the rules of the
@@ -325,8 +398,9 @@ class AnimatedWeightedMatrixGraph(AnimatedMatrixGraph):
             separate function 'reconstruct_astar_path' to build the full path, if required.
 
         Yields:
-            _type_: at the beginning of each iteration through the algorithm, a tuple containing the current node, the
-            state of visited nodes, and heapq of nodes to be processed.
+            _type_: at the beginning of each iteration through the algorithm, a tuple containing
+            the current node, the state of visited nodes, and an ordered list of the (cost,
+            node) pairs still to be processed.
         """
 
         def reconstruct_path(came_from, current):
@@ -336,7 +410,7 @@ class AnimatedWeightedMatrixGraph(AnimatedMatrixGraph):
                 total_path.insert(0, current)
             return total_path
 
-        open_set = []
+        open_set = IndexedPriorityQueue()
         came_from = {}
 
         g_score = defaultdict(lambda: float("inf"))
@@ -345,11 +419,11 @@ class AnimatedWeightedMatrixGraph(AnimatedMatrixGraph):
         f_score = defaultdict(lambda: float("inf"))
         f_score[start_node] = func(start_node, end_node)
 
-        heappush(open_set, (f_score[start_node], start_node))
-        yield start_node, (f_score, g_score, came_from), open_set
+        open_set.push(start_node, f_score[start_node])
+        yield start_node, (f_score, g_score, came_from), open_set.snapshot()
 
         while len(open_set) > 0:
-            _, current = heappop(open_set)
+            _, current = open_set.pop()
 
             if current == end_node:
                 yield (
@@ -360,7 +434,7 @@ class AnimatedWeightedMatrixGraph(AnimatedMatrixGraph):
                 break
 
             else:
-                for neighbour, cost in self.get_connections(current):
+                for neighbour, cost in self.neighbours(current):
                     tentative_g_score = g_score[current] + cost
                     if tentative_g_score < g_score[neighbour]:
                         came_from[neighbour] = current
@@ -369,15 +443,17 @@ class AnimatedWeightedMatrixGraph(AnimatedMatrixGraph):
                             neighbour, end_node
                         )
                         f_score[neighbour] = neighbour_f_score
-                        if neighbour not in open_set:
-                            heappush(open_set, (neighbour_f_score, neighbour))
+                        open_set.push(neighbour, neighbour_f_score)
 
-                yield current, (f_score, g_score, came_from), open_set
+                yield current, (f_score, g_score, came_from), open_set.snapshot()
 
     def bellman_ford(self, start_node, end_node=None):
         """
-        Implements the early-termination variant of the standard Bellman-Ford algorithm to find
+        Implements the queue-based (SPFA) variant of the standard Bellman-Ford algorithm to find
         the shortest path from a starting node(to a specific node, if and end node is given).
+        Rather than relaxing every edge on each pass, only the edges leaving a node whose
+        distance has just changed are relaxed again, so graphs with mostly positive weights need
+        only a small multiple of E relaxations instead of V x E.
 
         Args:
             start_node (string): node to be used as the starting point for the path finding
@@ -388,8 +464,9 @@ class AnimatedWeightedMatrixGraph(AnimatedMatrixGraph):
             the cost of travelling from the start node to that node (if no end node was given).
 
         Yields:
-            _type_: at the beginning of each iteration through the algorithm, a tuple containing the current node, the
-            state of visited nodes, and heapq of nodes to be processed.
+            _type_: at the beginning of each iteration through the algorithm, a tuple containing
+            the current node, the state of visited nodes, and the pass of the standard algorithm
+            that the latest relaxation belongs to.
         """
 
         # Step 1: initialize graph
@@ -403,22 +480,116 @@ class AnimatedWeightedMatrixGraph(AnimatedMatrixGraph):
 
         yield None, (distance, predecessor), None
 
-        # Step 2: relax edges repeatedly
-        for step in range(len(self.nodes) - 1):
-            changed = False
-            for u, v, weight in self.get_all_connections():
+        # Step 2: relax the edges out of each node whose distance has changed, queueing up the
+        # nodes that they improve; edges[v] counts the edges on the best path found to v so far
+        edges = defaultdict(lambda: 0)
+        queue = deque([start_node])
+        queued = {start_node}
+        cyclic = False
+
+        while len(queue) > 0 and not cyclic:
+            u = queue.popleft()
+            queued.discard(u)
+
+            for v, weight in self.neighbours(u):
                 if distance[u] + weight < distance[v]:
                     distance[v] = distance[u] + weight
                     predecessor[v] = u
-                    changed = True
+                    edges[v] = edges[u] + 1
+
+                    yield None, (distance, predecessor), edges[v] - 1
+
+                    if edges[v] >= len(self):
+                        # no shortest path needs as many edges as there are nodes, so there must
+                        # be a negative-weight cycle - leave step 3 to find it
+                        cyclic = True
+                        break
+
+                    if v not in queued:
+                        queue.append(v)
+                        queued.add(v)
+
+        yield from self.__bellman_ford_result(start_node, end_node, distance, predecessor)
+
+    def randomized_bellman_ford(self, start_node, end_node=None):
+        """
+        Implements Yen's improvement to the Bellman-Ford algorithm, with the random node
+        ordering of Bannister and Eppstein, to find the shortest path from a starting node (to a
+        specific node, if an end node is given). Each pass sweeps up a random ordering of the
+        nodes, relaxing the edges that lead further up it, then back down, relaxing the rest;
+        only the edges out of nodes whose distance has changed since they were last swept are
+        relaxed, and around a third as many passes as the standard algorithm are expected.
+
+        Args:
+            start_node (string): node to be used as the starting point for the path finding
+            end_node (string, optional): node to be used as a target / end point for the path finding. Defaults to None.
+
+        Returns:
+            _type_: Total cost and path, in order from start to end node (if an end node was given); or a list of tuples containing
+            the cost of travelling from the start node to that node (if no end node was given).
+
+        Yields:
+            _type_: at the beginning of each iteration through the algorithm, a tuple containing the current node, the
+            state of visited nodes, and the current pass.
+        """
+
+        # Step 1: initialize graph
+        distance = defaultdict(lambda: float("inf"))
+        predecessor = defaultdict(lambda: None)
+        distance[start_node] = 0
 
-                    yield None, (distance, predecessor), step
+        yield None, (distance, predecessor), None
+
+        # Step 2: relax edges repeatedly
+        # first randomise the order of nodes, preserving the starting node
+        ordering = sample(self.nodes, len(self.nodes))
+        start_index = ordering.index(start_node)
+        ordering[start_index], ordering[0] = ordering[0], ordering[start_index]
+        position = {node: index for index, node in enumerate(ordering)}
+
+        # then split for edges depending on u < v in the random ordering
+        increasing_edges = defaultdict(list)
+        decreasing_edges = defaultdict(list)
+        for u, v, weight in self.edge_list():
+            if position[u] < position[v]:
+                increasing_edges[u].append((v, weight))
+            else:
+                decreasing_edges[u].append((v, weight))
+
+        # then sweep up and back down the ordering until no more relaxations are required; any
+        # more passes than the standard algorithm would make mean there is a negative-weight
+        # cycle, which step 3 finds
+        affected = {start_node}
+        for step in range(len(self.nodes) - 1):
+            changed = set()
+            for sweep, edges in (
+                (ordering, increasing_edges),
+                (reversed(ordering), decreasing_edges),
+            ):
+                for u in sweep:
+                    if u in affected or u in changed:
+                        for v, weight in edges[u]:
+                            if distance[u] + weight < distance[v]:
+                                distance[v] = distance[u] + weight
+                                predecessor[v] = u
+                                changed.add(v)
+
+                                yield None, (distance, predecessor), step
 
             if not changed:
                 break
+            affected = changed
+
+        yield from self.__bellman_ford_result(start_node, end_node, distance, predecessor)
 
+    def __bellman_ford_result(self, start_node, end_node, distance, predecessor):
+        """
+        Shared final step of the Bellman-Ford variants: yields the negative-weight cycle if
+        there is one, otherwise the distances and predecessors (or the path and its cost, if an
+        end node was given).
+        """
         # Step 3: check for negative-weight cycles
-        for u, v, weight in self.get_all_connections():
+        for u, v, weight in self.edge_list():
             if distance[u] + weight < distance[v]:
                 predecessor[v] = u
 
@@ -454,6 +625,55 @@ class AnimatedWeightedMatrixGraph(AnimatedMatrixGraph):
 
             yield None, path, distance[end_node]
 
+    def floyd_warshall(self):
+        """
+        Implements the Floyd-Warshall algorithm to find the shortest paths between every pair of
+        nodes, allowing the paths to go through one more node on each pass.
+
+        Yields:
+            _type_: at the end of each pass, a tuple containing the node that paths were just
+            allowed through, the distance matrix (headed by the nodes, in the same form as the
+            graph's own matrix) and the pass; then finally no node, the distance matrix and the
+            successor matrix (the node following each node along the shortest path to each other
+            node). If there is a negative-weight cycle, the last tuple instead holds the nodes
+            whose shortest path back to themselves is negative, and a message.
+        """
+        nodes = self.nodes
+        position = {node: index for index, node in enumerate(nodes)}
+        size = len(nodes)
+
+        distance = [[float("inf")] * size for _ in range(size)]
+        successor = [[None] * size for _ in range(size)]
+        for index, node in enumerate(nodes):
+            distance[index][index] = 0
+            successor[index][index] = node
+        for u, v, weight in self.edge_list():
+            i, j = position[u], position[v]
+            if weight < distance[i][j]:
+                distance[i][j] = weight
+                successor[i][j] = v
+
+        for k in range(size):
+            through_k = distance[k]
+            for i in range(size):
+                to_k = distance[i][k]
+                if to_k == float("inf"):
+                    continue
+
+                row, next_row, next_k = distance[i], successor[i], successor[i][k]
+                for j, from_k in enumerate(through_k):
+                    if to_k + from_k < row[j]:
+                        row[j] = to_k + from_k
+                        next_row[j] = next_k
+
+            yield nodes[k], [nodes] + distance, k
+
+        ncycle = [node for index, node in enumerate(nodes) if distance[index][index] < 0]
+        if len(ncycle) > 0:
+            yield None, ncycle, "Negative-weight cycle detected"
+        else:
+            yield None, [nodes] + distance, successor
+
     def prims_mst(self, starting_node=None):
         """
         Implements Prim's algorithm to find the minimum spanning tree of a fully connected graph.
@@ -471,16 +691,26 @@ class AnimatedWeightedMatrixGraph(AnimatedMatrixGraph):
         key_values = defaultdict(lambda: float("inf"))
         parents = defaultdict(lambda: None)
 
-        key_values[choice(self.nodes) if starting_node is None else starting_node] = (
-            0  # starting node
-        )
+        start_node = choice(self.nodes) if starting_node is None else starting_node
+        key_values[start_node] = 0
+
+        # candidates are queued by key, then by position in self.nodes to break ties; a node may
+        # be queued more than once as its key drops, and any entry for a node already in the MST
+        # is simply skipped when it surfaces
+        positions = {node: position for position, node in enumerate(self.nodes)}
+        queue = [(0, positions[start_node], start_node)]
+        # if the queue runs dry the graph is disconnected, so carry on from the first node not
+        # yet reached
+        unreached = iter(self.nodes)
 
         results = []
         for _ in range(len(self)):
-            next_cheapest = min(
-                (node for node in self.nodes if not in_mst[node]),
-                key=lambda node: key_values[node],
-            )
+            while len(queue) > 0 and in_mst[queue[0][2]]:
+                heappop(queue)
+            if len(queue) > 0:
+                _, _, next_cheapest = heappop(queue)
+            else:
+                next_cheapest = next(node for node in unreached if not in_mst[node])
 
             in_mst[next_cheapest] = True
 
@@ -495,10 +725,11 @@ class AnimatedWeightedMatrixGraph(AnimatedMatrixGraph):
                     ]
                 )
 
-            for neighbour, weight in self.get_connections(next_cheapest):
+            for neighbour, weight in self.neighbours(next_cheapest):
                 if 0 < weight < key_values[neighbour] and not in_mst[neighbour]:
                     key_values[neighbour] = weight
                     parents[neighbour] = next_cheapest
+                    heappush(queue, (weight, positions[neighbour], neighbour))
 
         yield None, results, None
 
@@ -515,50 +746,38 @@ class AnimatedWeightedMatrixGraph(AnimatedMatrixGraph):
                 parents of each node and their rankings within the algorithm.
         """
 
-        def find(parents, node):
-            if parents[node] is None:
-                return node
-
-            return find(parents, parents[node])
-
-        def union(parents, ranks, node1, node2):
-            node1_root = find(parents, node1)
-            node2_root = find(parents, node2)
-
-            if ranks[node1_root] < ranks[node2_root]:
-                parents[node1_root] = node2_root
-            elif ranks[node1_root] > ranks[node2_root]:
-                parents[node2_root] = node1_root
-            else:
-                parents[node2_root] = node1_root
-                ranks[node1_root] += 1
-
         results = []  # MST
 
         # create a sorted collection of edges by weight from smallest up
         edges = {}
-        for node in self.nodes:
-            for neighbour, weight in self.get_connections(node):
-                if (node, neighbour) not in edges and (
-                    (neighbour, node) not in edges or edges[(neighbour, node)] != weight
-                ):
-                    edges[(node, neighbour)] = weight
+        for node, neighbour, weight in self.edge_list():
+            if (node, neighbour) not in edges and (
+                (neighbour, node) not in edges or edges[(neighbour, node)] != weight
+            ):
+                edges[(node, neighbour)] = weight
 
-        parents = defaultdict(lambda: None)
-        ranks = defaultdict(lambda: 0)
+        components = DisjointSet(self.nodes)
 
         for (edge1, edge2), weight in sorted(edges.items(), key=lambda i: i[1]):
-            yield ((edge1, edge2), weight), (parents, ranks), edges
+            yield ((edge1, edge2), weight), components.snapshot(), edges
 
-            parent1 = find(parents, edge1)
-            parent2 = find(parents, edge2)
-            if parent1 != parent2:
+            if components.union(edge1, edge2):
                 results.append(((edge1, edge2), weight))
-                union(parents, ranks, parent1, parent2)
 
         yield None, results, None
 
 
+class AnimatedSparseMatrixGraph(AnimatedMatrixGraph, SparseMatrixGraph):
+    """
+    the animated traversals of AnimatedMatrixGraph, over compressed sparse row (CSR) storage
+    """
+
+
+class AnimatedWeightedSparseMatrixGraph(AnimatedWeightedMatrixGraph, SparseMatrixGraph):
+    """the animated optimisation methods of AnimatedWeightedMatrixGraph, over compressed sparse
+    row (CSR) storage"""
+
+
 if __name__ == "__main__":
 
     def test_animated_matrix_graph():
@@ -703,34 +922,58 @@ if __name__ == "__main__":
         g.add_edge("E", "C", 7)
 
         for step in g.bellman_ford("A", "E"):
-            if isinstance(step, tuple):
-                if len(step[1]) == 2:
-                    _, (distances, predecessors), count = step
-                    if isinstance(count, int):
-                        print(
-                            "step:",
-                            count,
-                            "; processed:",
-                            " distances "
-                            + ", ".join(f"{k}: {v}" for k, v in distances.items()),
-                            " / predecessors "
-                            + ", ".join(f"{k}: {v}" for k, v in predecessors.items()),
-                        )
+            show_bellman_ford_step(step)
+
+        print("Randomized Bellman-Ford...")
+        for step in g.randomized_bellman_ford("A", "E"):
+            show_bellman_ford_step(step)
+
+    def show_bellman_ford_step(step):
+        if isinstance(step, tuple):
+            if len(step[1]) == 2:
+                _, (distances, predecessors), count = step
+                if isinstance(count, int):
+                    print(
+                        "step:",
+                        count,
+                        "; processed:",
+                        " distances " + ", ".join(f"{k}: {v}" for k, v in distances.items()),
+                        " / predecessors "
+                        + ", ".join(f"{k}: {v}" for k, v in predecessors.items()),
+                    )
+            else:
+                _, path, output = step
+                if isinstance(output, int):
+                    print(
+                        "Completed; shortest path:",
+                        output,
+                        "; final path:",
+                        ", ".join(f"{item}" for item in path),
+                    )
                 else:
-                    _, path, output = step
-                    if isinstance(output, int):
-                        print(
-                            "Completed; shortest path:",
-                            output,
-                            "; final path:",
-                            ", ".join(f"{item}" for item in path),
-                        )
-                    else:
-                        print(
-                            "Completed; {output} :",
-                            "; path:",
-                            ", ".join(f"{item}" for item in path),
-                        )
+                    print(
+                        "Completed; {output} :",
+                        "; path:",
+                        ", ".join(f"{item}" for item in path),
+                    )
+
+    def test_floyd_warshall():
+        print("Floyd-Warshall...")
+        g = AnimatedWeightedMatrixGraph()
+        g.add_nodes(["A", "B", "C", "D"])
+        g.add_edge("A", "B", 3)
+        g.add_edge("B", "C", -1)
+        g.add_edge("C", "D", 2)
+        g.add_edge("D", "A", 1)
+        g.add_edge("A", "C", 4)
+
+        for current, (nodes, *distance), other in g.floyd_warshall():
+            print(
+                "through:" if current is not None else "Completed;",
+                current,
+                "; distances:",
+                distance,
+            )
 
     def test_tree_detection():
         print("Testing animated weighted adjacency matrix tree detection...")
@@ -744,7 +987,14 @@ if __name__ == "__main__":
         g.add_edge("B", "D")
         print("Cyclic:", g.is_cyclic())
         print("Tree:", g.is_tree())
+        g.add_edge("D", "C")
+        print("Cyclic:", g.is_cyclic())
+        print("Tree:", g.is_tree())
+        g.delete_edge("D", "C", True)
+        print("Cyclic:", g.is_cyclic())
+        print("Tree:", g.is_tree())
 
     # test_animated_weighted_matrix_graph()
     test_bellman_ford()
+    # test_floyd_warshall()
     # test_tree_detection()
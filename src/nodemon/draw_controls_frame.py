@@ -120,6 +120,7 @@ class DrawControlsFrame(ttk.Frame):
             "canvas": self.__canvas_frame.get_canvas_as_dict(),
             "graph": StateModel().get_graph_matrix(),
             "weighted": StateModel().is_weighted(),
+            "sparse": StateModel().is_sparse(),
         }
 
         current_filename = StateModel().get_filename()
@@ -174,6 +175,7 @@ class DrawControlsFrame(ttk.Frame):
                 StateModel().set_graph_matrix(
                     file_contents["graph"],
                     file_contents["weighted"],
+                    file_contents.get("sparse", False),
                 )
         self.__weight.set("1" if StateModel().is_weighted() else "None")
         self.__toggle_mode_switch()
@@ -48,49 +48,53 @@ class DijkstraShortestPathFrame(TraceFrame):
                 )
             ):
                 cost, previous = self._processed_value[node]
-                self._canvas_frame.highlight_processed_node(node)
-
-                sub = ttk.Frame(self._processed, borderwidth=2)
-                sub.grid(sticky=tk.NSEW)
-                sub.columnconfigure((0, 1, 2), weight=1)
-
-                ttk.Label(
-                    sub,
-                    text=self._canvas_frame.get_label_from_node(node),
-                    anchor=tk.CENTER,
-                    bootstyle="inverse-info",
-                ).grid(
-                    sticky=tk.NSEW,
-                    padx=(8, 2),
-                    pady=3,
-                    row=row,
-                    column=0,
-                )
+                self._display_processed_row(row, node, cost, previous)
+
+    def _display_processed_row(self, row, node, cost, previous):
+        """Lists a processed node, with its cost and the node it was reached from."""
+        self._canvas_frame.highlight_processed_node(node)
+
+        sub = ttk.Frame(self._processed, borderwidth=2)
+        sub.grid(sticky=tk.NSEW, row=row)
+        sub.columnconfigure((0, 1, 2), weight=1)
+
+        ttk.Label(
+            sub,
+            text=self._canvas_frame.get_label_from_node(node),
+            anchor=tk.CENTER,
+            bootstyle="inverse-info",
+        ).grid(
+            sticky=tk.NSEW,
+            padx=(8, 2),
+            pady=3,
+            row=row,
+            column=0,
+        )
 
-                ttk.Label(sub, text=cost, anchor=tk.CENTER, bootstyle="inverse-info").grid(
-                    sticky=tk.NSEW,
-                    padx=(2, 2),
-                    pady=3,
-                    row=row,
-                    column=1,
-                )
+        ttk.Label(sub, text=cost, anchor=tk.CENTER, bootstyle="inverse-info").grid(
+            sticky=tk.NSEW,
+            padx=(2, 2),
+            pady=3,
+            row=row,
+            column=1,
+        )
 
-                ttk.Label(
-                    sub,
-                    text=(
-                        self._canvas_frame.get_label_from_node(previous)
-                        if previous is not None
-                        else "-"
-                    ),
-                    anchor=tk.CENTER,
-                    bootstyle="inverse-info",
-                ).grid(
-                    sticky=tk.NSEW,
-                    padx=(2, 8),
-                    pady=3,
-                    row=row,
-                    column=2,
-                )
+        ttk.Label(
+            sub,
+            text=(
+                self._canvas_frame.get_label_from_node(previous)
+                if previous is not None
+                else "-"
+            ),
+            anchor=tk.CENTER,
+            bootstyle="inverse-info",
+        ).grid(
+            sticky=tk.NSEW,
+            padx=(2, 8),
+            pady=3,
+            row=row,
+            column=2,
+        )
 
     def display_other(self):
         for child in self._other.winfo_children():
@@ -115,31 +119,7 @@ class DijkstraShortestPathFrame(TraceFrame):
             # incoming tuples mean algorithm is still on-going
             if type(self._other_value[0]) is tuple:
                 for row, (cost, node) in enumerate(sorted(self._other_value)):
-                    self._canvas_frame.highlight_pending_node(node)
-                    sub = ttk.Frame(self._other, borderwidth=2)
-                    sub.grid(sticky=tk.NSEW, row=row)
-                    sub.columnconfigure((0, 1), weight=1)
-
-                    ttk.Label(
-                        sub,
-                        text=self._canvas_frame.get_label_from_node(node),
-                        anchor=tk.CENTER,
-                        bootstyle="inverse-info",
-                    ).grid(
-                        sticky=tk.NSEW,
-                        padx=(8, 2),
-                        pady=3,
-                        row=row,
-                        column=0,
-                    )
-
-                    ttk.Label(sub, text=cost, anchor=tk.CENTER, bootstyle="inverse-info").grid(
-                        sticky=tk.NSEW,
-                        padx=(2, 8),
-                        pady=3,
-                        row=row,
-                        column=1,
-                    )
+                    self._display_queued_row(row, cost, node)
 
             # if it's not a tuple, it should be a string, which we'd get for an end point
             else:
@@ -168,15 +148,124 @@ class DijkstraShortestPathFrame(TraceFrame):
                         row += 1
                         column = 0
 
+    def _display_queued_row(self, row, cost, node):
+        """Lists a queued node, with its cost."""
+        self._canvas_frame.highlight_pending_node(node)
+        sub = ttk.Frame(self._other, borderwidth=2)
+        sub.grid(sticky=tk.NSEW, row=row)
+        sub.columnconfigure((0, 1), weight=1)
+
+        ttk.Label(
+            sub,
+            text=self._canvas_frame.get_label_from_node(node),
+            anchor=tk.CENTER,
+            bootstyle="inverse-info",
+        ).grid(
+            sticky=tk.NSEW,
+            padx=(8, 2),
+            pady=3,
+            row=row,
+            column=0,
+        )
+
+        ttk.Label(sub, text=cost, anchor=tk.CENTER, bootstyle="inverse-info").grid(
+            sticky=tk.NSEW,
+            padx=(2, 8),
+            pady=3,
+            row=row,
+            column=1,
+        )
+
+
+class BidirectionalDijkstraShortestPathFrame(DijkstraShortestPathFrame):
+    """
+    Dijkstra's shortest path searched from both ends at once. The processed nodes and the queue
+    are each shown as two labelled lists, one per search: the forward search's, with each
+    node's cost from the start and previous node, then the backward search's, with its cost to
+    the end and next node.
+    """
 
-class AStarShortestPathFrame(TraceFrame):
     def __init__(self, master, canvas_frame, from_node, to_node):
+        title = f"Bidirectional Dijkstra's Shortest Path from {from_node} to {to_node}"
+
+        TraceFrame.__init__(self, master, canvas_frame, title, from_node, to_node)
+        self._iterator = iter(StateModel().bidirectional_dijkstra(self._from, self._to))
+        self.initial_setup(
+            lambda master: CustomScrollableFrame(
+                master
+            ),  # Processed Node / Cost from Start / Previous, then to End / Next
+            lambda master: CustomScrollableFrame(master),  # Queued Node / Step Cost, per search
+        )
+
+    def display_processed(self):
+        for child in self._processed.winfo_children():
+            child.grid_remove()
+
+        self._processed.columnconfigure(0, weight=1)
+
+        row = 0
+        for heading, visited in zip(("From the start", "To the end"), self._processed_value):
+            self.__display_heading(self._processed, row, heading)
+            for row, node in enumerate(
+                sorted(visited, key=lambda node: self._canvas_frame.get_label_from_node(node)),
+                row + 1,
+            ):
+                cost, linked = visited[node]
+                self._display_processed_row(row, node, cost, linked)
+            row += 1
+
+    def display_other(self):
+        # the two frontiers while the search is going, then the path found once it's done
+        if type(self._other_value) is not tuple:
+            super().display_other()
+            return
+
+        for child in self._other.winfo_children():
+            child.grid_remove()
+
+        self._other.columnconfigure(0, weight=1)
+
+        row = 0
+        for heading, queued in zip(("Forward queue", "Backward queue"), self._other_value):
+            self.__display_heading(self._other, row, heading)
+            if len(queued) == 0:
+                row += 1
+                sub = ttk.Frame(self._other, borderwidth=2)
+                sub.grid(sticky=tk.NSEW, row=row)
+                sub.columnconfigure(0, weight=1)
+
+                ttk.Label(sub, text="Empty", anchor=tk.CENTER, bootstyle="inverse-info").grid(
+                    sticky=tk.NSEW,
+                    padx=8,
+                    pady=3,
+                )
+
+            for row, (cost, node) in enumerate(queued, row + 1):
+                self._display_queued_row(row, cost, node)
+            row += 1
+
+    @staticmethod
+    def __display_heading(frame, row, heading):
+        ttk.Label(frame, text=heading, anchor=tk.CENTER).grid(
+            sticky=tk.NSEW,
+            row=row,
+            pady=(5, 0),
+        )
+
+
+class AStarShortestPathFrame(TraceFrame):
+    def __init__(self, master, canvas_frame, from_node, to_node, heuristic="manhattan"):
         title = f"A* Shortest Path from {from_node} to {to_node}"
 
         super().__init__(master, canvas_frame, title, from_node, to_node)
-        self._iterator = iter(
-            StateModel().a_star(self._from, self._to, self.manhattan_distance)
-        )
+
+        # snapshot where every node is drawn, rather than asking the canvas on each estimate
+        positions = {
+            node: canvas_frame.get_node_coordinates(node) for node in StateModel().get_nodes()
+        }
+        self._heuristic = StateModel().a_star_heuristic(positions, heuristic)
+
+        self._iterator = iter(StateModel().a_star(self._from, self._to, self._heuristic))
         self.initial_setup(
             lambda master: CustomScrollableFrame(
                 master
@@ -184,17 +273,6 @@ class AStarShortestPathFrame(TraceFrame):
             lambda master: CustomScrollableFrame(master),  # Queued Node / Estimated Total Cost
         )
 
-    def manhattan_distance(self, node_from, node_to):
-        return sum(
-            (
-                abs(val1 - val2)
-                for val1, val2 in zip(
-                    self._canvas_frame.get_node_coordinates(self._from),
-                    self._canvas_frame.get_node_coordinates(self._to),
-                )
-            )
-        )
-
     def display_processed(self):
         """
         Called to display the processing data of an in-process A* path-finding algorithm. This will consist of the
@@ -498,3 +576,85 @@ class BellmanFordShortestPathFrame(TraceFrame):
 
     def display_other(self):
         pass
+
+
+class FloydWarshallFrame(TraceFrame):
+    """
+    Floyd-Warshall all-pairs shortest paths. The processed list shows the nodes that paths have
+    so far been allowed to go through; the distance matrix itself is put up for the
+    Representation tab to show.
+    """
+
+    def __init__(self, master, canvas_frame):
+        super().__init__(master, canvas_frame, "Floyd-Warshall All-Pairs Shortest Paths")
+        self._iterator = iter(StateModel().floyd_warshall())
+        self.initial_setup(
+            lambda master: CustomScrollableFrame(master),  # Nodes Paths Can Go Through
+            lambda master: ttk.Label(master),
+        )
+
+    def display_processed(self):
+        for child in self._processed.winfo_children():
+            child.grid_remove()
+
+        self._processed.columnconfigure(0, weight=1)
+
+        if isinstance(self._other_value, str):
+            # a negative-weight cycle, so the processed nodes are the ones on it
+            nodes = self._processed_value
+            value = self._other_value
+        else:
+            StateModel().set_representation_matrix(self._processed_value)
+            matrix_nodes = self._processed_value[0]
+            if isinstance(self._other_value, int):
+                nodes = matrix_nodes[: self._other_value + 1]
+                value = (
+                    f"Pass: {self._other_value + 1} of {len(matrix_nodes)}; "
+                    "distances in the Representation tab"
+                )
+            else:
+                nodes = matrix_nodes
+                value = "Completed; distances in the Representation tab"
+
+        for node in nodes:
+            self._canvas_frame.highlight_processed_node(node)
+
+            sub = ttk.Frame(self._processed, borderwidth=2)
+            sub.grid(sticky=tk.NSEW)
+            sub.columnconfigure(0, weight=1)
+
+            ttk.Label(
+                sub,
+                text=self._canvas_frame.get_label_from_node(node),
+                anchor=tk.CENTER,
+                bootstyle="inverse-info",
+            ).grid(
+                sticky=tk.NSEW,
+                padx=8,
+                pady=3,
+            )
+
+        self._other.config(text=value, width=len(value))
+
+    def display_other(self):
+        pass
+
+
+class RandomizedBellmanFordShortestPathFrame(BellmanFordShortestPathFrame):
+    """
+    Bellman-Ford shortest path with Yen's up-and-down sweeps over a random node ordering; the
+    step shown is the current pass, for comparing against the standard algorithm.
+    """
+
+    def __init__(self, master, canvas_frame, from_node, to_node):
+        if to_node is None or len(to_node.strip()) == 0:
+            title = f"Randomized Bellman-Ford Shortest Path from {from_node}"
+        else:
+            title = f"Randomized Bellman-Ford Shortest Path from {from_node} to {to_node}"
+
+        TraceFrame.__init__(self, master, canvas_frame, title, from_node, to_node)
+        self._iterator = iter(StateModel().randomized_bellman_ford(self._from, self._to))
+        self.initial_setup(
+            lambda master: CustomScrollableFrame(master),  # Distances / Predecessors
+            lambda master: ttk.Label(master),
+        )
@@ -83,15 +83,20 @@ class RepresentationFrame(ttk.Frame):
             style.map("half_height.TLabel", rowheight=[("!disabled", height // 2)])
 
     def __generate_table_data(self):
-        internal_matrix = StateModel().get_graph_matrix()
+        internal_matrix = StateModel().get_representation_matrix()
 
         if len(internal_matrix[0]) == 0:
             return (None, None, None)
 
         column_headings = [self.__canvas_frame.get_label_from_node(node) for node in internal_matrix[0]]
         row_values = [
-            [value if value else "-" for value in row]
+            [RepresentationFrame.__cell_text(value) for value in row]
             for col, row in enumerate(internal_matrix[1:])
         ]
 
         return column_headings, row_values, len(row_values)
+
+    @staticmethod
+    def __cell_text(value):
+        """Text for a matrix entry: "-" where there's no edge, or no finite distance."""
+        return "-" if value is False or value is None or value == float("inf") else value
@@ -0,0 +1,119 @@
+import os
+import pickle
+import sqlite3
+from collections import OrderedDict, defaultdict
+
+
+class ResultCache:
+    """
+    Final results of the graph algorithms, keyed by (graph fingerprint, algorithm, arguments...)
+    so that re-running an algorithm over a graph it has already been run on can skip straight
+    to the result.
+
+    The most recently used results are held in memory, dropping the least recently used beyond
+    size. Only if given a path are results also kept in a sqlite database there, so they last
+    between sessions, with the oldest dropped once they take up more than disk_size bytes; if
+    the database can't be used, the cache quietly carries on in memory alone.
+    """
+
+    def __init__(self, size=64, path=None, disk_size=32 * 1024 * 1024):
+        self.size = size
+        self.disk_size = disk_size
+        self._memory = OrderedDict()
+        self._database = None
+
+        if path is not None:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self._database = sqlite3.connect(path)
+                self._database.execute(
+                    "CREATE TABLE IF NOT EXISTS results "
+                    "(fingerprint TEXT, key BLOB, value BLOB, PRIMARY KEY (fingerprint, key))"
+                )
+                self._database.commit()
+            except (OSError, sqlite3.Error):
+                self._database = None
+
+    @staticmethod
+    def default_path():
+        """Where the on-disk results live: a nodemon folder under the user's cache directory."""
+        if os.name == "nt":
+            root = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+        else:
+            root = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        return os.path.join(root, "nodemon", "results.sqlite")
+
+    def get(self, key):
+        """Returns the result held under the given key, or None if there isn't one."""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+
+        if self._database is not None:
+            try:
+                row = self._database.execute(
+                    "SELECT value FROM results WHERE fingerprint = ? AND key = ?",
+                    (key[0], pickle.dumps(key[1:])),
+                ).fetchone()
+            except sqlite3.Error:
+                row = None
+
+            if row is not None:
+                value = pickle.loads(row[0])
+                self.__remember(key, value)
+                return value
+
+        return None
+
+    def put(self, key, value):
+        """Holds the result under the given key, whose first item is the graph's fingerprint."""
+        self.__remember(key, value)
+
+        if self._database is not None:
+            try:
+                stored = pickle.dumps(ResultCache.__plain(value))
+                if len(stored) <= self.disk_size:
+                    # replacing a row gives it a new rowid, so the rowids run from oldest to
+                    # newest stored
+                    self._database.execute(
+                        "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                        (key[0], pickle.dumps(key[1:]), stored),
+                    )
+                    self.__trim()
+                    self._database.commit()
+            except (sqlite3.Error, pickle.PicklingError, TypeError, AttributeError):
+                pass
+
+    def __trim(self):
+        """
+        Drops the oldest results from the database until what's left fits within disk_size.
+        """
+        (total,) = self._database.execute(
+            "SELECT COALESCE(SUM(LENGTH(value)), 0) FROM results"
+        ).fetchone()
+        while total > self.disk_size:
+            rowid, length = self._database.execute(
+                "SELECT rowid, LENGTH(value) FROM results ORDER BY rowid LIMIT 1"
+            ).fetchone()
+            self._database.execute("DELETE FROM results WHERE rowid = ?", (rowid,))
+            total -= length
+
+    def __remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.size:
+            self._memory.popitem(last=False)
+
+    @staticmethod
+    def __plain(value):
+        """
+        Copies a result with its defaultdicts turned into plain dicts, as the algorithms'
+        default factories are lambdas, which can't be pickled.
+        """
+        if isinstance(value, defaultdict):
+            value = dict(value)
+        if isinstance(value, dict):
+            return {key: ResultCache.__plain(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return type(value)(ResultCache.__plain(item) for item in value)
+        return value
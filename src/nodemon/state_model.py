@@ -1,7 +1,15 @@
+import os
 from itertools import chain, product
 from string import ascii_uppercase
 
-from .animated_structures import AnimatedMatrixGraph, AnimatedWeightedMatrixGraph
+from .result_cache import ResultCache
+from .structures import CoordinateHeuristic, GraphProperties
+from .animated_structures import (
+    AnimatedMatrixGraph,
+    AnimatedWeightedMatrixGraph,
+    AnimatedSparseMatrixGraph,
+    AnimatedWeightedSparseMatrixGraph,
+)
 
 
 class StateModel:
@@ -18,12 +26,19 @@ class StateModel:
 
             # Put any initialization here.
             cls.__instance.__graph = AnimatedWeightedMatrixGraph(True)
+            cls.__instance.__properties = GraphProperties(cls.__instance.__graph)
             cls.__instance.__filename = None
             cls.__instance.__tab_name = "DrawControlsFrame"
             cls.__instance.__operation = "Nodes"
             cls.__instance.__directed = False
             cls.__instance.__weight = 1
             cls.__instance.__changed = False
+            cls.__instance.__representation_matrix = None
+            # results are only kept on disk if a file is named in NODEMON_RESULT_CACHE
+            cls.__instance.__results = ResultCache(
+                path=os.environ.get("NODEMON_RESULT_CACHE") or None
+            )
+            cls.__instance.__replay_results = False
             cls.__instance.__generator = StateModel.__next_node_name_generator()
 
         return cls.__instance
@@ -37,14 +52,25 @@ class StateModel:
         """
         yield from chain(*[product(ascii_uppercase, repeat=i) for i in range(1, 1_000)])
 
-    def create_new(self, weighted=True):
-        # check which type of graph to create
+    def __create_graph(weighted, sparse):
+        """
+        Picks the graph class for the given combination of weighted / unweighted and dense (full
+        adjacency matrix) or sparse (compressed sparse row) storage; the sparse form is much
+        lighter for large, lightly connected graphs.
+        """
         if weighted:
-            self.__graph = AnimatedWeightedMatrixGraph(True)
-            self.__weight = 1
-        else:
-            self.__graph = AnimatedMatrixGraph(True)
-            self.__weight = None
+            return (
+                AnimatedWeightedSparseMatrixGraph(True)
+                if sparse
+                else AnimatedWeightedMatrixGraph(True)
+            )
+        return AnimatedSparseMatrixGraph(True) if sparse else AnimatedMatrixGraph(True)
+
+    def create_new(self, weighted=True, sparse=False):
+        # check which type of graph to create
+        self.__graph = StateModel.__create_graph(weighted, sparse)
+        self.__properties = GraphProperties(self.__graph)
+        self.__weight = 1 if weighted else None
 
         # restart the node name generator
         self.__generator = StateModel.__next_node_name_generator()
@@ -52,18 +78,32 @@ class StateModel:
         # whatever was created, nothing has yet been changed (but will need this to think about saving later)
         self.__changed = False
         self.__filename = None
+        self.__representation_matrix = None
+
+    def get_nodes(self):
+        return self.__graph.nodes
 
     def get_graph_matrix(self):
         return [self.__graph.nodes] + self.__graph.matrix
 
-    def set_graph_matrix(self, saved_matrix, is_weighted):
-        if is_weighted:
-            self.__graph = AnimatedWeightedMatrixGraph(True)
-        else:
-            self.__graph = AnimatedMatrixGraph(True)
-
-        self.__graph.nodes = saved_matrix[0]
-        self.__graph.matrix = saved_matrix[1:]
+    def get_representation_matrix(self):
+        """
+        The matrix for the Representation tab to show, in the same form as get_graph_matrix:
+        whatever a trace has put up to show (eg the all-pairs distances from Floyd-Warshall),
+        otherwise the graph's own adjacency matrix.
+        """
+        if self.__representation_matrix is not None:
+            return self.__representation_matrix
+        return self.get_graph_matrix()
+
+    def set_representation_matrix(self, matrix=None):
+        self.__representation_matrix = matrix
+
+    def set_graph_matrix(self, saved_matrix, is_weighted, is_sparse=False):
+        self.__graph = StateModel.__create_graph(is_weighted, is_sparse)
+        self.__graph.set_matrix(saved_matrix[0], saved_matrix[1:])
+        self.__properties = GraphProperties(self.__graph)
+        self.__representation_matrix = None
         last_node = max(self.__graph.nodes)
 
         # restart the node name generator
@@ -86,11 +126,22 @@ class StateModel:
 
     def is_tree(self):
         # print("Checking if tree...")
-        return self.__graph.is_tree()
+        return self.__properties.is_tree()
+
+    def is_connected(self):
+        return self.__properties.is_connected()
+
+    def component_count(self):
+        return self.__properties.component_count()
 
     def is_weighted(self):
         return isinstance(self.__graph, AnimatedWeightedMatrixGraph)
 
+    def is_sparse(self):
+        return isinstance(
+            self.__graph, (AnimatedSparseMatrixGraph, AnimatedWeightedSparseMatrixGraph)
+        )
+
     def set_operation_parameters(self, mode, directed, cost):
         self.__operation = mode
         self.__directed = directed
@@ -114,12 +165,58 @@ class StateModel:
     def get_next_node_name(self):
         return "".join(next(self.__generator))
 
+    def is_replaying_results(self):
+        return self.__replay_results
+
+    def set_replay_results(self, replay=True):
+        """
+        Sets whether the algorithms should skip straight to their final result when it has
+        already been worked out for the graph as it is now, rather than trace every step again.
+        """
+        self.__replay_results = replay
+
+    def set_result_cache_path(self, path=None):
+        """
+        Starts the result cache afresh, also keeping results in a sqlite database at the given
+        path (eg ResultCache.default_path()) so they last between sessions, or just in memory if
+        no path is given.
+        """
+        self.__results = ResultCache(path=path)
+
+    def __cached_trace(self, algorithm, arguments, trace):
+        """
+        Yields the steps of the given trace, caching the final one (the result) against the
+        graph's fingerprint, the algorithm and its arguments once the trace has run to the end;
+        when replaying results, a result already cached is yielded on its own instead. Results
+        are keyed by what the graph holds, so editing the graph needs nothing dropping from the
+        cache - the edited graph just has a different fingerprint.
+        """
+        # taken before tracing, as the graph may be edited, or replaced, while it's traced
+        graph = self.__graph
+        version = graph.version
+        key = (graph.fingerprint(), algorithm) + tuple(arguments)
+        if self.__replay_results:
+            result = self.__results.get(key)
+            if result is not None:
+                yield result
+                return
+
+        result = None
+        for result in trace:
+            yield result
+
+        # only keep the result if it's still for the graph it was keyed by
+        if result is not None and self.__graph is graph and graph.version == version:
+            self.__results.put(key, result)
+
     def add_node(self, node_name):
         self.__graph.add_node(node_name)
+        self.__properties.node_added(node_name)
         # print(self.__graph.matrix)
 
     def delete_node(self, node_name):
         self.__graph.delete_node(node_name)
+        self.__properties.removed()
         # print(self.__graph.matrix)
 
     def has_edge(self, from_node, to_node):
@@ -130,12 +227,43 @@ class StateModel:
             self.__graph.add_edge(from_node, to_node, weight, undirected)
         else:
             self.__graph.add_edge(from_node, to_node, undirected)
+        self.__edges_added([(from_node, to_node)])
         # print(self.__graph.matrix)
 
+    def add_edges_from(self, edges, undirected=False):
+        """
+        Adds a whole batch of (from_node, to_node, weight) edges in one go, eg when importing or
+        generating a graph; the weights are ignored if the graph is unweighted. Edges to or
+        from a node not already in the graph are skipped, on any kind of graph, so it never
+        holds a node the canvas hasn't drawn.
+        """
+        graph = self.__graph
+        edges = [edge for edge in edges if edge[0] in graph and edge[1] in graph]
+        graph.add_edges_from(edges, undirected)
+        self.__edges_added(edges)
+        self.__changed = True
+
+    def __edges_added(self, edges):
+        """Passes the given edges, and any reverse edges made with them, to the properties."""
+        for from_node, to_node, *_ in edges:
+            for edge in ((from_node, to_node), (to_node, from_node)):
+                if self.__graph.is_connected(*edge):
+                    self.__properties.edge_added(*edge)
+                elif edge[0] == from_node:
+                    # a weight of zero takes the edge out of the graph again
+                    self.__properties.removed()
+
     def delete_edge(self, node_from, node_to):
         self.__graph.delete_edge(node_from, node_to)
+        self.__properties.removed()
         # print(self.__graph.matrix)
 
+    def remove_edges_from(self, edges):
+        """Removes a whole batch of (from_node, to_node) edges in one go."""
+        self.__graph.remove_edges_from(edges)
+        self.__properties.removed()
+        self.__changed = True
+
     def breadth_first(self, start_node, end_node=None):
         yield from self.__graph.breadth_first(start_node, end_node)
 
@@ -144,7 +272,28 @@ class StateModel:
 
     def dijkstra(self, start_node, end_node=None):
         if isinstance(self.__graph, AnimatedWeightedMatrixGraph):
-            yield from self.__graph.dijkstra(start_node, end_node)
+            yield from self.__cached_trace(
+                "dijkstra", (start_node, end_node), self.__graph.dijkstra(start_node, end_node)
+            )
+
+    def bidirectional_dijkstra(self, start_node, end_node):
+        if isinstance(self.__graph, AnimatedWeightedMatrixGraph):
+            yield from self.__cached_trace(
+                "bidirectional_dijkstra",
+                (start_node, end_node),
+                self.__graph.bidirectional_dijkstra(start_node, end_node),
+            )
+
+    def get_heuristic_kinds(self):
+        """The kinds of A* heuristic there are to choose from, the default first."""
+        return CoordinateHeuristic.KINDS
+
+    def a_star_heuristic(self, positions, kind="manhattan"):
+        """
+        Creates an A* heuristic over the given node positions, of the given kind (see
+        CoordinateHeuristic), scaled to be consistent with the weights of the current graph.
+        """
+        return CoordinateHeuristic.consistent_with(self.__graph, positions, kind)
 
     def a_star(self, start_node, end_node, heuristic):
         if isinstance(self.__graph, AnimatedWeightedMatrixGraph):
@@ -156,11 +305,30 @@ class StateModel:
 
     def bellman_ford(self, start_node, end_node):
         if isinstance(self.__graph, AnimatedWeightedMatrixGraph):
-            yield from self.__graph.bellman_ford(
-                start_node,
-                end_node,
+            yield from self.__cached_trace(
+                "bellman_ford",
+                (start_node, end_node),
+                self.__graph.bellman_ford(
+                    start_node,
+                    end_node,
+                ),
             )
 
+    def randomized_bellman_ford(self, start_node, end_node):
+        if isinstance(self.__graph, AnimatedWeightedMatrixGraph):
+            yield from self.__cached_trace(
+                "randomized_bellman_ford",
+                (start_node, end_node),
+                self.__graph.randomized_bellman_ford(
+                    start_node,
+                    end_node,
+                ),
+            )
+
+    def floyd_warshall(self):
+        if isinstance(self.__graph, AnimatedWeightedMatrixGraph):
+            yield from self.__cached_trace("floyd_warshall", (), self.__graph.floyd_warshall())
+
     def pre_order(self, start_node, end_node):
         yield from self.__graph.pre_order(start_node, end_node)
 
@@ -172,8 +340,10 @@ class StateModel:
 
     def prims_mst(self, start_node=None):
         if isinstance(self.__graph, AnimatedWeightedMatrixGraph):
-            yield from self.__graph.prims_mst(start_node)
+            yield from self.__cached_trace(
+                "prims_mst", (start_node,), self.__graph.prims_mst(start_node)
+            )
 
     def kruskals_mst(self):
         if isinstance(self.__graph, AnimatedWeightedMatrixGraph):
-            yield from self.__graph.kruskals_mst()
+            yield from self.__cached_trace("kruskals_mst", (), self.__graph.kruskals_mst())
@@ -1,13 +1,25 @@
-from abc import abstractmethod
-from collections import defaultdict
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict, deque
+from hashlib import sha256
 from heapq import heappush, heappop
+from math import hypot, sqrt
+from operator import itemgetter
 from random import choice, sample
 
+try:
+    import numpy as np
+except ImportError:  # optional, only needed for NumpyWeightedMatrixGraph
+    np = None
+
 
 class TreeNode:
     """Simple, open, class for use in a binary search tree. Stores a given value, and
     references to parent, left and right children. Traversal methods pass in the whole
-    node and allow access to all attributes."""
+    node and allow access to all attributes. Uses slots rather than a per-instance dict, as
+    large trees hold a great many of these."""
+
+    __slots__ = ("value", "parent", "left", "right")
 
     def __init__(self, value):
         self.value = value
@@ -15,26 +27,63 @@ class TreeNode:
         self.left = None
         self.right = None
 
+    def iter_pre(self):
+        """Lazily yields this subtree's nodes in pre-order, by stack rather than recursion."""
+        stack = [self]
+        while len(stack) > 0:
+            node = stack.pop()
+            yield node
+            if node.right is not None:
+                stack.append(node.right)
+            if node.left is not None:
+                stack.append(node.left)
+
+    def iter_in(self, reverse=False):
+        """Lazily yields the nodes of this subtree in-order (or reverse in-order), using a
+        stack rather than recursion."""
+        stack = []
+        current = self
+        while len(stack) > 0 or current is not None:
+            if current is not None:
+                stack.append(current)
+                current = current.right if reverse else current.left
+            else:
+                node = stack.pop()
+                yield node
+                current = node.left if reverse else node.right
+
+    def iter_reverse_in(self):
+        """Lazily yields the nodes of this subtree in reverse in-order."""
+        return self.iter_in(True)
+
+    def iter_post(self):
+        """Lazily yields this subtree's nodes in post-order, by stack rather than recursion."""
+        stack = []
+        last = None
+        current = self
+        while len(stack) > 0 or current is not None:
+            if current is not None:
+                stack.append(current)
+                current = current.left
+            else:
+                node = stack[-1]
+                if node.right is not None and node.right is not last:
+                    current = node.right
+                else:
+                    yield node
+                    last = stack.pop()
+
     def pre_traverse(self, op):
-        op(self)
-        if self.left is not None:
-            self.left.pre_traverse(op)
-        if self.right is not None:
-            self.right.pre_traverse(op)
+        for node in self.iter_pre():
+            op(node)
 
     def in_traverse(self, op):
-        if self.left is not None:
-            self.left.in_traverse(op)
-        op(self)
-        if self.right is not None:
-            self.right.in_traverse(op)
+        for node in self.iter_in():
+            op(node)
 
     def post_traverse(self, op):
-        if self.left is not None:
-            self.left.post_traverse(op)
-        if self.right is not None:
-            self.right.post_traverse(op)
-        op(self)
+        for node in self.iter_post():
+            op(node)
 
     def __str__(self):
         return (
@@ -47,12 +96,17 @@ class TreeNode:
 
 class RedBlackNode(TreeNode):
     """Extends TreeNode for use in a RedBlackTree, adds an attribute to store the colour
-    of the node; True if the node is black, False if the node is red."""
+    of the node; True if the node is black, False if the node is red. Also holds the size
+    of the subtree rooted here, and the tree's aggregate (if any) over that subtree."""
+
+    __slots__ = ("is_black", "size", "total")
 
     def __init__(self, value, parent):
         super().__init__(value)
         self.parent = parent
         self.is_black = False
+        self.size = 1
+        self.total = value
 
     def __str__(self):
         return (
@@ -71,7 +125,7 @@ class RedBlackNode(TreeNode):
 
 class Tree:
     """Vanilla binary search tree implementation. Only provides checks for empty and
-    presence. Addition and standard traversal methods are also provided, no delete."""
+    presence. Addition, removal and standard traversal methods are also provided."""
 
     def __init__(self):
         self.root = None
@@ -115,9 +169,39 @@ class Tree:
                     else:
                         current = current.right
 
-    @abstractmethod
+    def _replace(self, node, replacement):
+        """Puts the replacement (which may be None) in the place of the given node, under
+        the node's parent."""
+        parent = node.parent
+
+        if parent is None:
+            self.root = replacement
+        elif parent.left is node:
+            parent.left = replacement
+        else:
+            parent.right = replacement
+
+        if replacement is not None:
+            replacement.parent = parent
+
+    @staticmethod
+    def _successor(node):
+        """Returns the in-order successor of a node that has a right child."""
+        current = node.right
+        while current.left is not None:
+            current = current.left
+        return current
+
     def _delete(self, candidate):
-        pass
+        # a node with both children swaps values with its successor, which has at most one
+        if candidate.left is not None and candidate.right is not None:
+            successor = Tree._successor(candidate)
+            candidate.value = successor.value
+            candidate = successor
+
+        self._replace(
+            candidate, candidate.left if candidate.left is not None else candidate.right
+        )
 
     def remove(self, value):
         if self.is_empty():
@@ -129,6 +213,7 @@ class Tree:
             while looking:
                 if value == current.value:
                     self._delete(current)
+                    looking = False
 
                 elif value < current.value:
                     if current.left is None:
@@ -170,6 +255,45 @@ class Tree:
 
         return found
 
+    def iter_pre(self):
+        return iter(()) if self.is_empty() else self.root.iter_pre()
+
+    def iter_in(self):
+        return iter(()) if self.is_empty() else self.root.iter_in()
+
+    def iter_reverse_in(self):
+        return iter(()) if self.is_empty() else self.root.iter_reverse_in()
+
+    def iter_post(self):
+        return iter(()) if self.is_empty() else self.root.iter_post()
+
+    def iter_range(self, lo=None, hi=None):
+        """
+        Lazily yields, in order, the nodes whose values lie between lo and hi (inclusive), never
+        descending into a subtree that lies wholly outside that range.
+
+        Args:
+            lo (optional): Smallest value to include. Defaults to None, for no lower limit.
+            hi (optional): Largest value to include. Defaults to None, for no upper limit.
+        """
+        stack = []
+        current = self.root
+        while len(stack) > 0 or current is not None:
+            if current is not None:
+                if lo is not None and current.value < lo:
+                    # everything on the left is too small as well
+                    current = current.right
+                else:
+                    stack.append(current)
+                    current = current.left
+            else:
+                node = stack.pop()
+                if hi is not None and node.value > hi:
+                    # ...and everything still to come is larger
+                    return
+                yield node
+                current = node.right
+
     def pre_traverse(self, op):
         if not self.is_empty():
             self.root.pre_traverse(op)
@@ -187,10 +311,179 @@ class RedBlackTree(Tree):
     """
     Implementation of the RedBlackTree detailed on Wikipedia as a child class of the
     binary search tree implemented above (see https://en.wikipedia.org/wiki/Red%E2%80%93black_tree).
+
+    Each node also records the size of its subtree and, if the tree was given a combine function
+    (any associative function of two values, eg min, max or operator.add), that function folded
+    over its subtree's values. Both are kept up to date through every insertion, deletion and
+    rotation, so rank(), select() and aggregate() each run in O(log n).
     """
 
-    def __init__(self):
+    def __init__(self, combine=None):
         super().__init__()
+        self.combine = combine
+
+    def __len__(self):
+        return 0 if self.is_empty() else self.root.size
+
+    def __join(self, *parts):
+        """
+        Folds the combine function over the given parts, in order, skipping any that are None.
+        """
+        result = None
+        for part in parts:
+            if part is not None:
+                result = part if result is None else self.combine(result, part)
+        return result
+
+    def __refresh(self, node):
+        """Recalculates the size and aggregate of the given node from those of its children."""
+        left, right = node.left, node.right
+        node.size = (
+            1 + (0 if left is None else left.size) + (0 if right is None else right.size)
+        )
+        if self.combine is not None:
+            node.total = self.__join(
+                None if left is None else left.total,
+                node.value,
+                None if right is None else right.total,
+            )
+
+    def __refresh_upwards(self, node):
+        """
+        Recalculates the sizes and aggregates from the given node all the way up to the root.
+        """
+        while node is not None:
+            self.__refresh(node)
+            node = node.parent
+
+    def rank(self, value):
+        """
+        Returns the number of values in the tree that are strictly less than the given one.
+        """
+        rank = 0
+        current = self.root
+        while current is not None:
+            if current.value < value:
+                rank += 1 + (0 if current.left is None else current.left.size)
+                current = current.right
+            else:
+                current = current.left
+        return rank
+
+    def select(self, k):
+        """
+        Returns the k-th smallest value in the tree, counting from zero.
+
+        Raises:
+            IndexError: if k is outside the range of the tree
+        """
+        if not 0 <= k < len(self):
+            raise IndexError("select index out of range")
+
+        current = self.root
+        while True:
+            left_size = 0 if current.left is None else current.left.size
+            if k < left_size:
+                current = current.left
+            elif k == left_size:
+                return current.value
+            else:
+                k -= left_size + 1
+                current = current.right
+
+    def aggregate(self, lo=None, hi=None):
+        """
+        Returns the tree's combine function folded, in order, over the values between lo and hi
+        (inclusive), or None if there are no such values.
+
+        Args:
+            lo (optional): Smallest value to include. Defaults to None, for no lower limit.
+            hi (optional): Largest value to include. Defaults to None, for no upper limit.
+        """
+        if self.combine is None:
+            raise ValueError("aggregate needs a tree created with a combine function")
+
+        # find the highest node in range; the paths down to lo and hi split from here
+        split = self.root
+        while split is not None:
+            if lo is not None and split.value < lo:
+                split = split.right
+            elif hi is not None and split.value > hi:
+                split = split.left
+            else:
+                break
+        if split is None:
+            return None
+
+        # on the left, everything that is at least lo, gathered from the largest down
+        left = None
+        current = split.left
+        while current is not None:
+            if lo is None:
+                left = self.__join(current.total, left)
+                break
+            elif current.value >= lo:
+                left = self.__join(
+                    current.value, None if current.right is None else current.right.total, left
+                )
+                current = current.left
+            else:
+                current = current.right
+
+        # on the right, everything that is at most hi, gathered from the smallest up
+        right = None
+        current = split.right
+        while current is not None:
+            if hi is None:
+                right = self.__join(right, current.total)
+                break
+            elif current.value <= hi:
+                right = self.__join(
+                    right, None if current.left is None else current.left.total, current.value
+                )
+                current = current.right
+            else:
+                current = current.left
+
+        return self.__join(left, split.value, right)
+
+    @classmethod
+    def from_sorted(cls, values, combine=None):
+        """
+        Builds a balanced tree from values that are already in ascending order, in O(n) and
+        without any of the rotations that adding them one at a time would cost.
+
+        The middle value of each run becomes the root of its subtree, so every level but the
+        deepest is full; colouring the nodes on that deepest level red, and the rest black,
+        then gives every path the same number of black nodes.
+
+        Args:
+            values (iterable): Values to be held in the tree, in ascending order
+            combine (function, optional): As for the constructor. Defaults to None.
+        """
+        values = list(values)
+        tree = cls(combine)
+        red_depth = (len(values)).bit_length() - 1
+
+        def build(start, end, parent, depth):
+            if start >= end:
+                return None
+
+            middle = (start + end) // 2
+            node = RedBlackNode(values[middle], parent)
+            node.is_black = depth != red_depth or depth == 0
+            node.left = build(start, middle, node, depth + 1)
+            node.right = build(middle + 1, end, node, depth + 1)
+            tree.__refresh(node)
+            return node
+
+        tree.root = build(0, len(values), None, 0)
+        return tree
+
+    @staticmethod
+    def __is_red(node):
+        """Returns True if the node is red; missing (NIL) nodes are considered black."""
+        return node is not None and not node.is_black
 
     def __rotate_subtree(self, parent, direction):
         """Rotates the subtree (which may be the root of the tree) in the given direction
@@ -221,6 +514,10 @@ class RedBlackTree(Tree):
         else:
             self.root = sibling
 
+        # parent is now the child of sibling, so must be brought up to date first
+        self.__refresh(parent)
+        self.__refresh(sibling)
+
         return sibling
 
     def _insert(self, value, parent, on_right):
@@ -235,6 +532,9 @@ class RedBlackTree(Tree):
         else:
             parent.left = node
 
+        # count the new node in every subtree above it; rotations below keep this up to date
+        self.__refresh_upwards(parent)
+
         # start of the (do while)-loop:
         while True:
             if parent.is_black:
@@ -285,205 +585,1043 @@ class RedBlackTree(Tree):
                 break
         # end of the (do while)-loop
 
-        def _delete(self, candidate):
-            pass
-
-
-"""
-        def _delete(self, candidate : RedBlackNode):
-                # need to add the simple cases first, before proceeding
-
-                parent = candidate.parent # -> parent node of N
-                on_right = RedBlackNode.is_right_child(candidate) # side of P on which N is located (∈ { LEFT, RIGHT })
-                # -> sibling of N
-                # -> close     nephew
-                # -> distant nephew
-
-                # P != NULL, since N is not the root.
-                # Replace N at its parent P by NIL:
-                P->child[dir] = NIL;
-                goto Start_D;            // jump into the loop
-
-                # start of the (do while)-loop:
-                while True:
-                        dir = childDir(N);     // side of parent P on which node N is located
-                        Start_D:
-                        S = P->child[1-dir]; // sibling of N (has black height >= 1)
-                        D = S->child[1-dir]; // distant nephew
-                        C = S->child[    dir]; // close     nephew
-                        if (S->color == RED)
-                                goto Case_D3;                                    // S red ===> P+C+D black
-                        // S is black:
-                        if (D != NIL && D->color == RED) // not considered black
-                                goto Case_D6;                                    // D red && S black
-                        if (C != NIL && C->color == RED) // not considered black
-                                goto Case_D5;                                    // C red && S+D black
-                        // Here both nephews are == NIL (first iteration) or black (later).
-                        if (P->color == RED)
-                                goto Case_D4;                                    // P red && C+S+D black
-
-                        // Case_D1 (P == NULL):
-                        return; // deletion complete
-
-                        // Case_D2 (P+C+S+D black):
-                        S->color = RED;
-                        N = P; // new current node (maybe the root)
-                        // iterate 1 black level
-                        //     (= 1 tree level) higher
-
-                        parent = candidate.parent
-                        if parent is None:
-                                break
-                # end of the (do while)-loop
-"""
+    def _delete(self, candidate):
+        # a node with both children swaps values with its successor, which has at most one
+        if candidate.left is not None and candidate.right is not None:
+            successor = Tree._successor(candidate)
+            candidate.value = successor.value
+            candidate = successor
+
+        child = candidate.left if candidate.left is not None else candidate.right
+        parent = candidate.parent
+
+        if child is not None or parent is None or not candidate.is_black:
+            # simple cases: N is the root, or red, or has a single (necessarily red) child
+            self._replace(candidate, child)
+            self.__refresh_upwards(parent)
+            if child is not None:
+                child.is_black = True
+            return
 
+        # N is a black non-root leaf; removing it leaves its side one black node short
+        on_right = RedBlackNode.is_right_child(candidate)
+        self._replace(candidate, None)
+        self.__refresh_upwards(parent)
 
-class ListGraph:
-    class ListGraphNode:
-        def __init__(self, node):
-            self.node = node
-            self.paths = []
+        # start of the (do while)-loop:
+        while True:
+            sibling = parent.left if on_right else parent.right  # has black height >= 1
+
+            if RedBlackTree.__is_red(sibling):
+                # Case_D3 (S red && P+C+D black):
+                self.__rotate_subtree(parent, on_right)  # P may be the root
+                parent.is_black = False
+                sibling.is_black = True
+                sibling = parent.left if on_right else parent.right  # the old close nephew
+                # now P red && S black
+
+            distant = sibling.left if on_right else sibling.right
+            close = sibling.right if on_right else sibling.left
+
+            if RedBlackTree.__is_red(distant) or RedBlackTree.__is_red(close):
+                if not RedBlackTree.__is_red(distant):
+                    # Case_D5 (C red && S+D black):
+                    self.__rotate_subtree(sibling, not on_right)  # S is never the root
+                    sibling.is_black = False
+                    close.is_black = True
+                    distant, sibling = sibling, close
+                    # fall through to Case_D6
+
+                # Case_D6 (D red && S black):
+                self.__rotate_subtree(parent, on_right)  # P may be the root
+                sibling.is_black = parent.is_black
+                parent.is_black = True
+                distant.is_black = True
+                return  # deletion complete
+
+            if not parent.is_black:
+                # Case_D4 (P red && S+C+D black):
+                sibling.is_black = False
+                parent.is_black = True
+                return  # deletion complete
+
+            # Case_D2 (P+C+S+D black):
+            sibling.is_black = False
+            node = parent  # new current node (maybe the root)
+            # iterate 1 black level
+            #     (= 1 tree level) higher
+
+            parent = node.parent
+            if parent is None:
+                # Case_D1 (N is the root):
+                return  # deletion complete
+            on_right = RedBlackNode.is_right_child(node)
+        # end of the (do while)-loop
+
+
+class DisjointSet:
+    """
+    Union-find (disjoint set) structure over a collection of hashable items, eg the nodes of a
+    graph. Each item is numbered as it is added, and the parent and rank of each are held in
+    parallel arrays against that number. find() uses iterative path halving, and union() joins
+    by rank, so both are close to O(1) amortised, with no recursion however long the chains.
+    """
+
+    def __init__(self, items=()):
+        self._indices = {}  # item -> number
+        self._items = []  # number -> item
+        self._parents = array("l")
+        self._ranks = array("l")
+        self.count = 0  # how many disjoint sets there are
+        for item in items:
+            self.add(item)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._indices
+
+    def add(self, item):
+        """Adds the item, in a set of its own, if it isn't already present."""
+        if item not in self._indices:
+            index = len(self._items)
+            self._indices[item] = index
+            self._items.append(item)
+            self._parents.append(index)
+            self._ranks.append(0)
+            self.count += 1
+
+    def _find_index(self, index):
+        parents = self._parents
+        while parents[index] != index:
+            # path halving: point each node visited at its grandparent on the way up
+            parents[index] = parents[parents[index]]
+            index = parents[index]
+        return index
+
+    def find(self, item):
+        """Returns the representative item of the set holding the given item."""
+        return self._items[self._find_index(self._indices[item])]
+
+    def union(self, item1, item2):
+        """
+        Joins the sets holding the two items.
+
+        Returns:
+            bool: True if the sets were joined, False if the items were already in the same set
+        """
+        root1 = self._find_index(self._indices[item1])
+        root2 = self._find_index(self._indices[item2])
+        if root1 == root2:
+            return False
+
+        if self._ranks[root1] < self._ranks[root2]:
+            root1, root2 = root2, root1
+        self._parents[root2] = root1
+        if self._ranks[root1] == self._ranks[root2]:
+            self._ranks[root1] += 1
+        self.count -= 1
+        return True
+
+    def connected(self, item1, item2):
+        return self._find_index(self._indices[item1]) == self._find_index(self._indices[item2])
+
+    def snapshot(self):
+        """
+        Returns a copy of the current state, eg for display while tracing an algorithm.
+
+        Returns:
+            tuple: dicts of the parent of each item (None for the representative of a set), and
+            of each item's rank
+        """
+        items = self._items
+        parents = {
+            item: None if parent == index else items[parent]
+            for index, (item, parent) in enumerate(zip(items, self._parents))
+        }
+        ranks = dict(zip(items, self._ranks))
+        return parents, ranks
+
+
+class GraphProperties:
+    """
+    Connectivity, number of components, number of edges and whether there are any cycles, for a
+    graph whose edges are each taken as an (undirected) connection between two nodes; kept up to
+    date as the graph is edited, so reading any of them is O(1). Adding nodes and edges is
+    folded in with union-find as it happens; deleting anything can split a component, which
+    union-find can't undo, so instead it marks the properties stale, to be worked out again from
+    the graph itself when next read.
+
+    Whether the graph is a tree does follow the direction of its edges, as its traversals do:
+    while every edge has its reverse that's the same as being connected and acyclic, but with
+    any one-way edges it's worked out by walking the graph (see __directed_tree), and kept until
+    the graph is next edited.
+    """
+
+    def __init__(self, graph):
+        self._graph = graph
+        self._stale = True
+
+    def _refresh(self):
+        if self._stale:
+            self._components = DisjointSet(self._graph.nodes)
+            self._pairs = set()  # each connected pair of nodes, whichever way round
+            self._arcs = set()  # each edge, from node to node
+            self._one_way = (
+                0  # edges between two different nodes without the matching edge in reverse
+            )
+            self._cyclic = False
+            self._tree = None
+            self._stale = False
+            for from_node, to_node, *_ in self._graph.edge_list():
+                self.edge_added(from_node, to_node)
+
+    def node_added(self, node):
+        if not self._stale:
+            self._components.add(node)
+            self._tree = None
+
+    def edge_added(self, from_node, to_node):
+        if not self._stale and (from_node, to_node) not in self._arcs:
+            self._arcs.add((from_node, to_node))
+            if from_node != to_node:
+                self._one_way += -1 if (to_node, from_node) in self._arcs else 1
+            self._tree = None
+
+            pair = frozenset((from_node, to_node))
+            if pair not in self._pairs:
+                self._pairs.add(pair)
+                self._components.add(from_node)
+                self._components.add(to_node)
+                if not self._components.union(from_node, to_node):
+                    # includes a loopback, which is always in its own set already
+                    self._cyclic = True
+
+    def removed(self):
+        """Marks the properties stale after a node or edge has been deleted."""
+        self._stale = True
+
+    def component_count(self):
+        self._refresh()
+        return self._components.count
+
+    def edge_count(self):
+        self._refresh()
+        return len(self._pairs)
+
+    def is_connected(self):
+        return self.component_count() <= 1
+
+    def is_cyclic(self):
+        self._refresh()
+        return self._cyclic
+
+    def is_tree(self):
+        if not self._graph.undirected:
+            return False
+
+        self._refresh()
+        if self._one_way == 0:
+            return self.is_connected() and not self.is_cyclic()
+        if self._tree is None:
+            self._tree = self.__directed_tree()
+        return self._tree
+
+    def __directed_tree(self):
+        """
+        Walks the graph breadth first from its first node, along the direction of each edge,
+        reaching a node once for each node it's reached from; it's a tree if that reaches every
+        node with no edge leading back to a node already walked, bar the one it came from.
+        """
+        graph = self._graph
+        if len(graph) == 0:
+            return True
+
+        root = graph.nodes[0]
+        walked = set()
+        queued = {(root, None)}
+        queue = deque([(root, None)])
+        while len(queue) > 0:
+            current, previous = queue.popleft()
+            walked.add(current)
+            for node, _ in graph.neighbours(current):
+                if node in walked:
+                    if node != previous:
+                        return False
+                elif (node, current) not in queued:
+                    queued.add((node, current))
+                    queue.append((node, current))
+
+        return len(walked) == len(graph)
+
+
+class RootedTree:
+    """
+    Index of a tree rooted at a given node, built in a single breadth-first pass over the graph
+    from the root. Each node reached is numbered in the order it was reached, and its parent,
+    first child, next sibling, depth and the size of the subtree below it are held in parallel
+    arrays against that number (-1 where there is no such node). A node's children are the
+    neighbours that hadn't already been reached, in the order the graph gives them, so the first
+    is taken as the "left" child; for other graphs, this is a breadth-first spanning tree.
+    """
+
+    def __init__(self, graph, root):
+        self._nodes = [root]  # number -> node
+        self._indices = {root: 0}  # node -> number
+        self._parents = array("l", [-1])
+        self._first_children = array("l", [-1])
+        self._next_siblings = array("l", [-1])
+        self._depths = array("l", [0])
+
+        nodes, indices = self._nodes, self._indices
+        index = 0
+        while index < len(nodes):
+            last_child = -1
+            for neighbour, _ in graph.neighbours(nodes[index]):
+                if neighbour not in indices:
+                    child = len(nodes)
+                    indices[neighbour] = child
+                    nodes.append(neighbour)
+                    self._parents.append(index)
+                    self._first_children.append(-1)
+                    self._next_siblings.append(-1)
+                    self._depths.append(self._depths[index] + 1)
+
+                    if last_child < 0:
+                        self._first_children[index] = child
+                    else:
+                        self._next_siblings[last_child] = child
+                    last_child = child
+            index += 1
+
+        # every node is numbered after its parent, so working backwards totals each subtree
+        # before its parent's
+        self._sizes = array("l", [1]) * len(nodes)
+        for index in range(len(nodes) - 1, 0, -1):
+            self._sizes[self._parents[index]] += self._sizes[index]
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __contains__(self, node):
+        return node in self._indices
 
-        def add_edge(self, to):
-            if to not in self.paths:
-                self.paths.append(to)
+    @property
+    def root(self):
+        return self._nodes[0]
 
-        def is_connected(self, to):
-            return to in self.paths
+    def parent(self, node):
+        """Returns the parent of the given node, or None for the root."""
+        parent = self._parents[self._indices[node]]
+        return self._nodes[parent] if parent >= 0 else None
 
-        def __str__(self):
-            return f"ListGraphNode(node: {self.node}, paths: {', '.join(self.paths)})"
+    def children(self, node):
+        """Iterates over the children of the given node, in order."""
+        child = self._first_children[self._indices[node]]
+        while child >= 0:
+            yield self._nodes[child]
+            child = self._next_siblings[child]
+
+    def depth(self, node):
+        return self._depths[self._indices[node]]
+
+    def subtree_size(self, node):
+        """Returns the number of nodes in the subtree below (and including) the given node."""
+        return self._sizes[self._indices[node]]
+
+
+class IndexedPriorityQueue:
+    """
+    Binary min-heap of (priority, item) entries that also tracks where each item sits in the
+    heap, so each item is held at most once, membership checks are O(1), and an item's priority
+    can be changed in place (eg decrease-key in Dijkstra) in O(log n). Entries are ordered as
+    tuples, so ties on priority fall back to comparing the items, just as with heapq.
+    """
 
     def __init__(self):
-        self.nodes = []
+        self._heap = []  # (priority, item) entries
+        self._positions = {}  # item -> position of its entry in the heap
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, item):
+        return item in self._positions
+
+    def priority(self, item):
+        return self._heap[self._positions[item]][0]
+
+    def push(self, item, priority):
+        """
+        Adds the item with the given priority or, if it is already queued, changes its priority
+        to the given one.
+        """
+        position = self._positions.get(item)
+        if position is None:
+            self._heap.append((priority, item))
+            self._sift_up(len(self._heap) - 1)
+        else:
+            old_priority = self._heap[position][0]
+            self._heap[position] = (priority, item)
+            if priority < old_priority:
+                self._sift_up(position)
+            else:
+                self._sift_down(position)
+
+    def peek(self):
+        """Returns the (priority, item) entry at the front of the queue, without removing it."""
+        return self._heap[0]
+
+    def pop(self):
+        """
+        Removes and returns the (priority, item) entry at the front of the queue.
+
+        Raises:
+            IndexError: if the queue is empty
+        """
+        heap = self._heap
+        if len(heap) == 0:
+            raise IndexError("pop from an empty priority queue")
+
+        last = heap.pop()
+        if len(heap) == 0:
+            del self._positions[last[1]]
+            return last
+
+        entry = heap[0]
+        del self._positions[entry[1]]
+        heap[0] = last
+        self._positions[last[1]] = 0
+        self._sift_down(0)
+        return entry
+
+    def snapshot(self):
+        """Returns the queued (priority, item) entries in order, eg to show while tracing."""
+        return sorted(self._heap)
+
+    def _sift_up(self, position):
+        heap, positions = self._heap, self._positions
+        entry = heap[position]
+        while position > 0:
+            parent = (position - 1) // 2
+            if not entry < heap[parent]:
+                break
+            heap[position] = heap[parent]
+            positions[heap[position][1]] = position
+            position = parent
+        heap[position] = entry
+        positions[entry[1]] = position
+
+    def _sift_down(self, position):
+        heap, positions = self._heap, self._positions
+        size = len(heap)
+        entry = heap[position]
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if not heap[child] < entry:
+                break
+            heap[position] = heap[child]
+            positions[heap[position][1]] = position
+            position = child
+        heap[position] = entry
+        positions[entry[1]] = position
+
+
+class CoordinateHeuristic:
+    """
+    A* heuristic estimating the cost between two nodes from their positions (eg on the canvas).
+    The positions are copied into parallel arrays once, when the heuristic is created, so each
+    estimate is O(1) rather than a lookup of the drawing. The estimate is the chosen distance
+    between the two positions multiplied by scale; a node with no known position is estimated at
+    zero, which keeps the heuristic admissible.
+
+    Kinds of distance offered:
+        manhattan: sum of the horizontal and vertical distances
+        euclidean: straight line distance
+        octile: distance moving horizontally, vertically or diagonally
+        zero: always zero, so A* behaves just like Dijkstra
+    """
+
+    KINDS = ("manhattan", "euclidean", "octile", "zero")
+
+    def __init__(self, positions, kind="manhattan", scale=1):
+        """
+        Args:
+            positions (dict): (x, y) position of each node, or None where it isn't known
+            kind (str, optional): One of KINDS. Defaults to "manhattan".
+            scale (float, optional): Multiplier to convert distances into edge weights.
+                Defaults to 1.
+        """
+        if kind not in CoordinateHeuristic.KINDS:
+            raise ValueError(f"Unknown heuristic kind: {kind}")
+
+        self.kind = kind
+        self.scale = scale
+        self._indices = {}
+        self._xs = array("d")
+        self._ys = array("d")
+        for node, position in positions.items():
+            if position is not None:
+                self._indices[node] = len(self._xs)
+                self._xs.append(position[0])
+                self._ys.append(position[1])
+
+    @classmethod
+    def consistent_with(cls, graph, positions, kind="manhattan"):
+        """
+        Creates a heuristic scaled so that, for every edge in the given graph, the estimate is
+        no more than the edge's weight. As each distance obeys the triangle inequality, that
+        makes the heuristic consistent (and so admissible) while being as large, and so as
+        helpful to A*, as a single scale allows.
+        """
+        heuristic = cls(positions, kind, 1)
+        scale = float("inf")
+        for from_node, to_node, weight in graph.iter_edges():
+            distance = heuristic(from_node, to_node)
+            if distance > 0:
+                scale = min(scale, max(weight, 0) / distance)
+        heuristic.scale = scale if scale != float("inf") else 1
+        return heuristic
+
+    def distance(self, from_index, to_index):
+        """Returns the unscaled distance between the positions held at the given indices."""
+        dx = abs(self._xs[from_index] - self._xs[to_index])
+        dy = abs(self._ys[from_index] - self._ys[to_index])
+        match self.kind:
+            case "manhattan":
+                return dx + dy
+            case "euclidean":
+                return hypot(dx, dy)
+            case "octile":
+                return max(dx, dy) + (sqrt(2) - 1) * min(dx, dy)
+        return 0
+
+    def __call__(self, node, goal):
+        from_index = self._indices.get(node)
+        to_index = self._indices.get(goal)
+        if from_index is None or to_index is None:
+            return 0
+        return self.scale * self.distance(from_index, to_index)
+
+
+class ListGraph:
+    """
+    a (by default undirected) graph held as adjacency lists - a dict mapping each node to a dict
+    of its neighbours, and the value of the edge to each - so adding, removing and looking up
+    nodes and edges are all O(1) on average, and memory grows with the number of edges rather
+    than the square of the number of nodes. Edges into each node are tracked too, so deleting a
+    node only touches its own neighbours.
+    """
+
+    def __init__(self, undirected=True):
+        self.undirected = undirected
+        self._adjacency = {}  # node -> {neighbour: value} for each edge leaving the node
+        self._incoming = {}  # node -> set of the nodes with an edge into it
+
+    @property
+    def nodes(self):
+        """Names of the nodes in the graph, in the order they were added."""
+        return list(self._adjacency)
+
+    def is_empty(self):
+        return len(self) == 0
+
+    def __len__(self):
+        return len(self._adjacency)
 
     def contains(self, value):
         return value in self
 
     def __contains__(self, value):
-        for n in self.nodes:
-            if n.node == value:
-                return True
-        return False
+        return value in self._adjacency
 
     def add_node(self, node):
-        if node not in self:
-            self.nodes.append(ListGraph.ListGraphNode(node))
+        if node not in self._adjacency:
+            self._adjacency[node] = {}
+            self._incoming[node] = set()
 
     def delete_node(self, node):
-        if node in self:
-            # remove the node itself
-            for n in range(len(self.nodes)):
-                if self.nodes[n].node == node:
-                    break
-            del self.nodes[n]
+        if node in self._adjacency:
             # remove references to the node
-            for n in self.nodes:
-                if node in n.paths:
-                    n.paths.remove(node)
-
-    def add_edge(self, from_node, to_node):
-        if from_node in self and to_node in self:
-            for n in self.nodes:
-                if n.node == from_node:
-                    n.add_edge(to_node)
-                elif n.node == to_node:
-                    n.add_edge(from_node)
+            for from_node in self._incoming.pop(node):
+                del self._adjacency[from_node][node]
+            for to_node in self._adjacency.pop(node):
+                if to_node != node:
+                    self._incoming[to_node].discard(node)
+
+    def add_edge(self, from_node, to_node, value=True, undirected=None):
+        """
+        Adds an edge from one node to another; re-add to update the edge
+
+        Args:
+            from_node (string): Name of the node at one end of the edge
+            to_node (string): Name of the node at the other end of the edge
+            value (optional): Weight, or other value, to hold against the edge.
+                Defaults to True.
+            undirected (bool, optional): If True, will create the matching edge in reverse.
+                Defaults to the graph's own setting.
+        """
+        if from_node in self._adjacency and to_node in self._adjacency:
+            self._adjacency[from_node][to_node] = value
+            self._incoming[to_node].add(from_node)
+            if self.undirected if undirected is None else undirected:
+                self._adjacency[to_node][from_node] = value
+                self._incoming[from_node].add(to_node)
+
+    def delete_edge(self, from_node, to_node, undirected=None):
+        if self.is_connected(from_node, to_node):
+            del self._adjacency[from_node][to_node]
+            self._incoming[to_node].discard(from_node)
+            if (self.undirected if undirected is None else undirected) and self.is_connected(
+                to_node, from_node
+            ):
+                del self._adjacency[to_node][from_node]
+                self._incoming[from_node].discard(to_node)
 
     def is_connected(self, from_node, to_node):
-        if from_node in self and to_node in self:
-            for n in self.nodes:
-                if n.node == from_node:
-                    return n.is_connected(to_node)
-        return False
+        return to_node in self._adjacency.get(from_node, ())
+
+    def iter_neighbours(self, node):
+        """Lazily yields the (neighbour, value) pairs for each edge leaving the given node."""
+        return iter(self._adjacency.get(node, {}).items())
+
+    def iter_edges(self):
+        """Lazily yields the (from_node, to_node, value) triples for every edge in the graph."""
+        for from_node, neighbours in self._adjacency.items():
+            for to_node, value in neighbours.items():
+                yield from_node, to_node, value
+
+    def get_connections(self, node):
+        return self.iter_neighbours(node)
+
+    def get_all_connections(self):
+        return list(self.iter_edges())
+
+    def depth_first(self, start_node, end_node=None):
+        if start_node in self:
+            discovered = set([start_node])
+            visited = []
+            stack = [start_node]
+
+            while len(stack) > 0:
+                current = stack.pop()
+                visited.append(current)
+
+                if current == end_node:
+                    break
+
+                for node in self._adjacency[current]:
+                    if node not in discovered:
+                        discovered.add(node)
+                        stack.append(node)
+            return visited
+        return None
+
+    def breadth_first(self, start_node, end_node=None):
+        if start_node in self:
+            discovered = set([start_node])
+            visited = []
+            queue = deque([start_node])
+
+            while len(queue) > 0:
+                current = queue.popleft()
+                visited.append(current)
+
+                if current == end_node:
+                    break
+
+                for node in self._adjacency[current]:
+                    if node not in discovered:
+                        discovered.add(node)
+                        queue.append(node)
+            return visited
+        return None
 
 
 class MatrixGraph:
-    """an unweighted, (possibly) directional graph"""
+    """
+    an unweighted, (possibly) directional graph
+
+    Each node is given a slot (its row and column in the matrix). Deleting a node just clears
+    its row and column and leaves a tombstone in its slot, which the next node added will
+    reuse; compact() squeezes out any remaining tombstones. The matrix itself is allocated with
+    spare capacity, doubled when it runs out, so adding nodes one at a time doesn't resize
+    every row each time.
+
+    Every change to the graph bumps its version; each node's neighbours are kept, as first
+    asked for, until the version changes, and derived properties (eg whether the graph is a
+    tree) are memoised against it in a small LRU cache, so repeated traces over an unchanged
+    graph don't rescan the matrix.
+    """
+
+    cache_size = 64  # most memoised derived properties to hold at once
 
     def __init__(self, undirected=False):
-        self.nodes = []
-        self.matrix = [[]]
         self.undirected = undirected
+        self._slots = []  # node name held in each slot, None for a deleted node
+        self._indices = {}  # node name -> slot
+        self._free = []  # slots of deleted nodes, ready for reuse
+        self._nodes = []
+        self._version = 0
+        self._cache = OrderedDict()
+        self._cache_version = 0
+        self._adjacency = {}  # node -> its (neighbour, value) pairs, as of _adjacency_version
+        self._adjacency_version = 0
+        self._load([])
+
+    ###
+    # storage primitives - everything else goes through these, so alternative backends (eg
+    # SparseMatrixGraph) only need to override this handful of methods
+    #
+
+    def _load(self, matrix):
+        """Replaces the storage with the given list of (square) rows, one per slot."""
+        self._capacity = len(self._slots)
+        self._rows = [list(row) for row in matrix[: self._capacity]]
+
+    def _reserve(self, size):
+        """Makes sure the storage has room for the given number of slots."""
+        if size > self._capacity:
+            capacity = max(size, self._capacity * 2, 8)
+            extra = capacity - self._capacity
+            for row in self._rows:
+                row.extend([False] * extra)
+            self._rows.extend([False] * capacity for n in range(extra))
+            self._capacity = capacity
+
+    def _clear_slot(self, index):
+        """Removes every edge into or out of the given slot."""
+        self._rows[index] = [False] * self._capacity
+        for row in self._rows:
+            row[index] = False
+
+    def _compact(self, live):
+        """Rebuilds the storage holding only the given slots, renumbered in the order given."""
+        self._rows = [[self._rows[i][j] for j in live] for i in live]
+        self._capacity = len(live)
+
+    def _get_edge(self, from_index, to_index):
+        return self._rows[from_index][to_index]
+
+    def _set_edge(self, from_index, to_index, value):
+        self._rows[from_index][to_index] = value
+
+    def _row_items(self, index):
+        """
+        Returns the (to_index, value) pairs for each edge leaving the node at the given slot.
+        """
+        return ((to_index, value) for to_index, value in enumerate(self._rows[index]) if value)
+
+    def _set_edges(self, from_indices, to_indices, values):
+        """Sets a batch of edges given as parallel sequences of from-slot, to-slot and value."""
+        rows = self._rows
+        for from_index, to_index, value in zip(from_indices, to_indices, values):
+            rows[from_index][to_index] = value
+
+    def _live_slots(self):
+        """
+        Slots of the nodes in the graph, in the order the nodes were added (which a reused slot
+        doesn't follow).
+        """
+        return list(self._indices.values())
+
+    def _mutated(self):
+        """Marks the graph as changed, dropping anything memoised against the last version."""
+        self._version += 1
+
+    def _memoised(self, key, compute):
+        """
+        Returns the result memoised under the given key for the current version of the graph,
+        calling compute() to work it out (and remember it) if there isn't one, evicting the
+        least recently used results beyond cache_size.
+        """
+        cache = self._cache
+        if self._cache_version != self._version:
+            cache.clear()
+            self._cache_version = self._version
+
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+
+        value = cache[key] = compute()
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return value
+
+    def _apply_edges(self, edges, undirected, value=None):
+        """
+        Writes a batch of (from_node, to_node[, weight]) edges, resolving each node to its slot
+        just once and skipping any edge with a missing node. Each edge is set to the given value
+        or, if that is None, to its weight (defaulting to 1).
+        """
+        indices = self._indices
+        from_indices = []
+        to_indices = []
+        values = []
+        for from_node, to_node, *weight in edges:
+            from_index = indices.get(from_node)
+            to_index = indices.get(to_node)
+            if from_index is not None and to_index is not None:
+                edge_value = value if value is not None else weight[0] if len(weight) > 0 else 1
+                from_indices.append(from_index)
+                to_indices.append(to_index)
+                values.append(edge_value)
+                # the reverse edge goes straight after, so a later edge between the same nodes
+                # overwrites both directions, just as it would with add_edge
+                if undirected:
+                    from_indices.append(to_index)
+                    to_indices.append(from_index)
+                    values.append(edge_value)
+
+        self._set_edges(from_indices, to_indices, values)
+        self._mutated()
+
+    @property
+    def nodes(self):
+        """Names of the nodes in the graph, in the order they were added."""
+        if self._nodes is None:
+            self._nodes = list(self._indices)
+        return self._nodes
+
+    @property
+    def version(self):
+        """Count of the changes made to the graph, eg to tell whether it has changed."""
+        return self._version
+
+    def fingerprint(self):
+        """
+        A hash of what the graph holds - its kind, nodes and edges - which is the same for
+        identical graphs however they were built (and whatever slots their nodes ended up in),
+        eg to key results worked out from the graph.
+        """
+        return self._memoised(
+            ("fingerprint",),
+            lambda: sha256(
+                repr(
+                    (
+                        type(self).__name__,
+                        self.undirected,
+                        sorted(self.nodes, key=repr),
+                        sorted(self.edge_list(), key=repr),
+                    )
+                ).encode()
+            ).hexdigest(),
+        )
+
+    @property
+    def matrix(self):
+        """A full (list of rows) copy of the adjacency matrix, eg for saving or display."""
+        live = self._live_slots()
+        rows = [[self._get_edge(i, j) for j in live] for i in live]
+        return rows if len(rows) > 0 else [[]]
+
+    def set_matrix(self, nodes, matrix):
+        """
+        Replaces the whole graph with the given nodes and (square) adjacency matrix, eg when
+        loading from a file.
+
+        Args:
+            nodes (list): Names of the nodes, in matrix order
+            matrix (list): List of rows, one per node, holding the edge values
+        """
+        self._slots = list(nodes)
+        self._indices = {node: index for index, node in enumerate(self._slots)}
+        self._free = []
+        self._nodes = None
+        self._load(matrix)
+        self._mutated()
+
+    def compact(self):
+        """
+        Removes the tombstones left by deleted nodes, and any spare capacity, from the storage.
+        """
+        live = self._live_slots()
+        self._compact(live)
+        self._slots = [self._slots[index] for index in live]
+        self._indices = {node: index for index, node in enumerate(self._slots)}
+        self._free = []
 
     def is_empty(self):
         return len(self) == 0
 
     def __len__(self):
-        return len(self.nodes)
+        return len(self._indices)
 
     def __contains__(self, node):
-        return node in self.nodes
+        return node in self._indices
 
     def add_node(self, node):
-        if node not in self.nodes:
-            self.nodes.append(node)
-            for existing in self.matrix:
-                existing.append(False)
-            if len(self.nodes) > 1:
-                self.matrix.append([False for n in range(len(self.nodes))])
+        if node not in self._indices:
+            if len(self._free) > 0:
+                index = self._free.pop()
+                self._slots[index] = node
+            else:
+                index = len(self._slots)
+                self._slots.append(node)
+                self._reserve(len(self._slots))
+            self._indices[node] = index
+            self._nodes = None
+            self._mutated()
+
+    def add_nodes(self, nodes):
+        """
+        Adds each of the given nodes (skipping any already present), growing the storage just
+        once for the lot.
+
+        Args:
+            nodes (iterable): Names of the nodes to add
+        """
+        new_nodes = [node for node in dict.fromkeys(nodes) if node not in self._indices]
+        self._reserve(len(self._slots) + max(0, len(new_nodes) - len(self._free)))
+        for node in new_nodes:
+            self.add_node(node)
 
     def delete_node(self, node):
-        if node in self.nodes:
-            index = self.nodes.index(node)
-            del self.nodes[index]
-            del self.matrix[index]
-            for n in range(len(self.matrix)):
-                del self.matrix[n][index]
+        if node in self._indices:
+            index = self._indices.pop(node)
+            self._clear_slot(index)
+            self._slots[index] = None
+            self._free.append(index)
+            self._nodes = None
+            self._mutated()
 
     def add_edge(self, from_node, to_node, undirected=None):
-        if from_node not in self.nodes:
+        if from_node not in self._indices:
             self.add_node(from_node)
-        if to_node not in self.nodes:
+        if to_node not in self._indices:
             self.add_node(to_node)
-        if not self.is_connected(from_node, to_node):
-            from_index = self.nodes.index(from_node)
-            to_index = self.nodes.index(to_node)
-            self.matrix[from_index][to_index] = True
+        from_index = self._indices[from_node]
+        to_index = self._indices[to_node]
+        if not self._get_edge(from_index, to_index):
+            self._set_edge(from_index, to_index, True)
             if (
                 (undirected is None and self.undirected) or
                 (undirected is not None and undirected)
                ):
-                self.matrix[to_index][from_index] = True
+                self._set_edge(to_index, from_index, True)
+            self._mutated()
+
+    def add_edges_from(self, edges, undirected=None):
+        """
+        Adds a whole batch of edges in one go, adding any nodes not yet in the graph.
+
+        Args:
+            edges (iterable): (from_node, to_node) pairs; any third item (weight) is ignored
+            undirected (bool, optional): If True, will create the matching edges in reverse.
+                Defaults to the graph's own setting.
+        """
+        edges = list(edges)
+        self.add_nodes(node for edge in edges for node in edge[:2])
+        self._apply_edges(edges, self.undirected if undirected is None else undirected, True)
 
     def delete_edge(self, from_node, to_node, undirected=False):
         if self.is_connected(from_node, to_node):
-            from_index = self.nodes.index(from_node)
-            to_index = self.nodes.index(to_node)
-            self.matrix[from_index][to_index] = False
+            from_index = self._indices[from_node]
+            to_index = self._indices[to_node]
+            self._set_edge(from_index, to_index, False)
             if self.undirected and undirected:
-                self.matrix[to_index][from_index] = False
+                self._set_edge(to_index, from_index, False)
+            self._mutated()
+
+    def remove_edges_from(self, edges, undirected=False):
+        """
+        Removes a whole batch of edges in one go; edges that aren't in the graph are ignored.
+
+        Args:
+            edges (iterable): (from_node, to_node) pairs; any third item (weight) is ignored
+            undirected (bool, optional): If True, and the graph is undirected, will also remove
+                the matching edges in reverse. Defaults to False.
+        """
+        self._apply_edges(edges, self.undirected and undirected, False)
 
     def is_connected(self, from_node, to_node):
-        if from_node in self.nodes and to_node in self.nodes:
-            from_index = self.nodes.index(from_node)
-            to_index = self.nodes.index(to_node)
-            return self.matrix[from_index][to_index]
+        from_index = self._indices.get(from_node)
+        to_index = self._indices.get(to_node)
+        if from_index is not None and to_index is not None:
+            return self._get_edge(from_index, to_index)
         return False
 
+    def iter_neighbour_indices(self, index):
+        """Lazily yields the (to_index, value) pairs for each edge leaving the given slot."""
+        return self._row_items(index)
+
+    def iter_edge_indices(self):
+        """
+        Lazily yields the (from_index, to_index, value) triples for every edge in the graph.
+        """
+        for from_index in self._live_slots():
+            for to_index, value in self._row_items(from_index):
+                yield from_index, to_index, value
+
+    def iter_neighbours(self, node):
+        """Lazily yields the (neighbour, value) pairs for each edge leaving the given node."""
+        index = self._indices.get(node)
+        if index is not None:
+            slots = self._slots
+            for to_index, value in self._row_items(index):
+                yield slots[to_index], value
+
+    def iter_edges(self):
+        """Lazily yields the (from_node, to_node, value) triples for every edge in the graph."""
+        slots = self._slots
+        for from_index, to_index, value in self.iter_edge_indices():
+            yield slots[from_index], slots[to_index], value
+
+    def neighbours(self, node):
+        """Memoised (neighbour, value) pairs for each edge leaving the given node."""
+        if self._adjacency_version != self._version:
+            self._adjacency = {}
+            self._adjacency_version = self._version
+
+        # a plain dict rather than the LRU cache, as this is looked up in every traversal's
+        # inner loop, and only ever holds one entry per node
+        edges = self._adjacency.get(node)
+        if edges is None:
+            edges = self._adjacency[node] = tuple(self.iter_neighbours(node))
+        return edges
+
+    def edge_list(self):
+        """
+        The (from_node, to_node, value) triples for every edge in the graph, memoised until the
+        graph next changes.
+        """
+        return self._memoised(("edges",), lambda: tuple(self.iter_edges()))
+
+    def rooted_at(self, root):
+        """The RootedTree index of the graph from the given node, memoised per version."""
+        return self._memoised(("rooted_at", root), lambda: RootedTree(self, root))
+
+    def in_neighbours(self, node):
+        """
+        The (neighbour, value) pairs for each edge arriving at the given node, memoised until
+        the graph next changes.
+        """
+        return self._memoised(("incoming",), self._incoming).get(node, ())
+
+    def _incoming(self):
+        """
+        Builds the reverse adjacency of the graph - for each node, the (neighbour, value) pairs
+        for edges into it.
+        """
+        incoming = defaultdict(list)
+        for from_node, to_node, value in self.iter_edges():
+            incoming[to_node].append((from_node, value))
+        return {node: tuple(edges) for node, edges in incoming.items()}
+
     def get_connections(self, node):
-        if node in self.nodes:
-            return iter(
-                [
-                    c
-                    for c in zip(self.nodes, self.matrix[self.nodes.index(node)])
-                    if c[1]
-                ]
-            )
-        return []
+        return self.iter_neighbours(node)
 
     def get_all_connections(self):
-        all = []
-        for node in self.nodes:
-            all += [
-                (node, c[0], c[1])
-                for c in zip(self.nodes, self.matrix[self.nodes.index(node)])
-                if c[1]
-            ]
-        return all
+        return list(self.iter_edges())
 
     def depth_first(self, start_node, end_node=None):
-        if start_node in self.nodes:
+        if start_node in self:
             discovered = set([start_node])
             visited = []
             stack = [start_node]
@@ -495,7 +1633,7 @@ class MatrixGraph:
                 if current == end_node:
                     break
 
-                for node, _ in self.get_connections(current):
+                for node, _ in self.neighbours(current):
                     if node not in discovered:
                         discovered.add(node)
                         stack.append(node)
@@ -503,19 +1641,19 @@ class MatrixGraph:
         return None
 
     def breadth_first(self, start_node, end_node=None):
-        if start_node in self.nodes:
+        if start_node in self:
             discovered = set([start_node])
             visited = []
-            queue = [start_node]
+            queue = deque([start_node])
 
             while len(queue) > 0:
-                current = queue.pop(0)
+                current = queue.popleft()
                 visited.append(current)
 
                 if current == end_node:
                     break
 
-                for node, _ in self.get_connections(current):
+                for node, _ in self.neighbours(current):
                     if node not in discovered:
                         discovered.add(node)
                         queue.append(node)
@@ -539,35 +1677,57 @@ class WeightedMatrixGraph(MatrixGraph):
             weight (int, optional): Cost of travelling the edge. Defaults to 1.
             undirected (bool, optional): If True, will create the matching edge in reverse. Defaults to False.
         """
-        if from_node in self.nodes and to_node in self.nodes:
-            from_index = self.nodes.index(from_node)
-            to_index = self.nodes.index(to_node)
-            self.matrix[from_index][to_index] = weight
+        if from_node in self._indices and to_node in self._indices:
+            from_index = self._indices[from_node]
+            to_index = self._indices[to_node]
+            self._set_edge(from_index, to_index, weight)
             if (
                 (undirected is None and self.undirected) or
                 (undirected is not None and undirected)
                ):
-                self.matrix[to_index][from_index] = weight
+                self._set_edge(to_index, from_index, weight)
+            self._mutated()
+
+    def add_edges_from(self, edges, undirected=None):
+        """
+        Adds (or updates) a whole batch of edges in one go; as with add_edge, edges with a
+        missing node are skipped
 
-    def dijkstra(self, start_node, end_node=None):
-        queue = []
+        Args:
+            edges (iterable): (from_node, to_node, weight) tuples; the weight may be left off,
+                defaulting to 1
+            undirected (bool, optional): If True, will create the matching edges in reverse.
+                Defaults to the graph's own setting.
+        """
+        self._apply_edges(edges, self.undirected if undirected is None else undirected)
+
+    def dijkstra(self, start_node, end_node=None, potential=None):
+        """
+        Finds the shortest path(s) from the start node using Dijkstra's algorithm; given a
+        potential (a number per node), each edge is instead reweighted by the potential of the
+        node it leaves less that of the node it reaches, as in Johnson's algorithm, and the
+        costs returned are the reweighted ones.
+        """
+        queue = IndexedPriorityQueue()
         data = defaultdict(lambda: [float("inf"), None])
         data[start_node] = [0, None]
 
-        heappush(queue, (0, start_node))
+        queue.push(start_node, 0)
 
         while len(queue) > 0:
-            current_cost, current_node = heappop(queue)
+            current_cost, current_node = queue.pop()
 
             if current_node == end_node:
                 break
 
-            for neighbour, cost in self.get_connections(current_node):
+            for neighbour, cost in self.neighbours(current_node):
+                if potential is not None:
+                    cost += potential[current_node] - potential[neighbour]
                 previous_cost, _ = data[neighbour]
                 if current_cost + cost < previous_cost:
                     data[neighbour][0] = current_cost + cost
                     data[neighbour][1] = current_node
-                    heappush(queue, (data[neighbour][0], neighbour))
+                    queue.push(neighbour, data[neighbour][0])
 
         if end_node is None:
             return data.items()
@@ -580,6 +1740,77 @@ class WeightedMatrixGraph(MatrixGraph):
         path.append(current)
         return path[::-1]
 
+    def bidirectional_dijkstra(self, start_node, end_node):
+        """
+        Finds the shortest path between two nodes by running Dijkstra forwards from the start
+        node and backwards, over the reversed edges, from the end node, always growing the
+        smaller frontier. The search stops as soon as the two frontiers can no longer beat the
+        best path found where they have met, so usually settles far fewer nodes than a single
+        search. Like Dijkstra, it assumes there are no negative weights.
+
+        Args:
+            start_node (string): node to be used as the starting point for the path finding
+            end_node (string): node to be used as the end point for the path finding
+
+        Returns:
+            list: Path, in order from start to end node; or None if the end can't be reached.
+        """
+        forward = {start_node: [0, None]}  # node -> [cost from start, previous node]
+        backward = {end_node: [0, None]}  # node -> [cost to end, next node]
+        forward_queue = IndexedPriorityQueue()
+        forward_queue.push(start_node, 0)
+        backward_queue = IndexedPriorityQueue()
+        backward_queue.push(end_node, 0)
+
+        best, meeting = (0, start_node) if start_node == end_node else (float("inf"), None)
+
+        while len(forward_queue) > 0 and len(backward_queue) > 0:
+            if forward_queue.peek()[0] + backward_queue.peek()[0] >= best:
+                break
+
+            if len(forward_queue) <= len(backward_queue):
+                queue, data, other, neighbours = (
+                    forward_queue,
+                    forward,
+                    backward,
+                    self.neighbours,
+                )
+            else:
+                queue, data, other, neighbours = (
+                    backward_queue,
+                    backward,
+                    forward,
+                    self.in_neighbours,
+                )
+
+            current_cost, current_node = queue.pop()
+            for neighbour, cost in neighbours(current_node):
+                if current_cost + cost < data.get(neighbour, (float("inf"),))[0]:
+                    data[neighbour] = [current_cost + cost, current_node]
+                    queue.push(neighbour, current_cost + cost)
+                if (
+                    neighbour in data
+                    and neighbour in other
+                    and data[neighbour][0] + other[neighbour][0] < best
+                ):
+                    best = data[neighbour][0] + other[neighbour][0]
+                    meeting = neighbour
+
+        if meeting is None:
+            return None
+
+        path = []
+        current = meeting
+        while current is not None:
+            path.append(current)
+            current = forward[current][1]
+        path.reverse()
+        current = backward[meeting][1]
+        while current is not None:
+            path.append(current)
+            current = backward[current][1]
+        return path
+
     @staticmethod
     def astar_manhattan_distance(node_from, node_to):
         return sum(abs(val1 - val2) for val1, val2 in zip(node_from, node_to))
@@ -592,7 +1823,7 @@ class WeightedMatrixGraph(MatrixGraph):
         return total_path
 
     def astar(self, start_node, end_node, func):
-        open_set = []
+        open_set = IndexedPriorityQueue()
         came_from = {}
 
         g_score = defaultdict(lambda: float("inf"))
@@ -601,23 +1832,22 @@ class WeightedMatrixGraph(MatrixGraph):
         f_score = defaultdict(lambda: float("inf"))
         f_score[start_node] = func(start_node, end_node)
 
-        heappush(open_set, (f_score[start_node], start_node))
+        open_set.push(start_node, f_score[start_node])
 
         while len(open_set) > 0:
-            _, current = heappop(open_set)
+            _, current = open_set.pop()
 
             if current == end_node:
                 return came_from
 
-            for friend, cost in self.get_connections(current):
+            for friend, cost in self.neighbours(current):
                 tentative_g_score = g_score[current] + cost
                 if tentative_g_score < g_score[friend]:
                     came_from[friend] = current
                     g_score[friend] = tentative_g_score
                     friend_f_score = tentative_g_score + func(friend, end_node)
                     f_score[friend] = friend_f_score
-                    if friend not in open_set:
-                        heappush(open_set, (friend_f_score, friend))
+                    open_set.push(friend, friend_f_score)
 
     def bellman_ford(self, start_node, end_node=None):
         """
@@ -640,7 +1870,7 @@ class WeightedMatrixGraph(MatrixGraph):
         # Step 2: relax edges repeatedly
         for _ in range(len(self.nodes) - 1):
             changed = False
-            for u, v, weight in self.get_all_connections():
+            for u, v, weight in self.edge_list():
                 if distance[u] + weight < distance[v]:
                     distance[v] = distance[u] + weight
                     predecessor[v] = u
@@ -649,7 +1879,7 @@ class WeightedMatrixGraph(MatrixGraph):
                 break
 
         # Step 3: check for negative-weight cycles
-        for u, v, weight in self.get_all_connections():
+        for u, v, weight in self.edge_list():
             if distance[u] + weight < distance[v]:
                 predecessor[v] = u
 
@@ -705,41 +1935,42 @@ class WeightedMatrixGraph(MatrixGraph):
         ordering = sample(self.nodes, len(self.nodes))
         start_index = ordering.index(start_node)
         ordering[start_index], ordering[0] = ordering[0], ordering[start_index]
+        position = {node: index for index, node in enumerate(ordering)}
 
         # then split for edges depending on u < v in the random ordering
         increasing_edges = defaultdict(list)
         decreasing_edges = defaultdict(list)
-        for u, v, w in self.get_all_connections():
-            if ordering.index(u) < ordering.index(v):
-                increasing_edges[u].append((u, v, w))
+        for u, v, w in self.edge_list():
+            if position[u] < position[v]:
+                increasing_edges[u].append((v, w))
             else:
-                decreasing_edges[u].append((u, v, w))
+                decreasing_edges[u].append((v, w))
 
-        # then repeat until no more relaxations are required
+        # then sweep up and back down the ordering until no more relaxations are required, only
+        # relaxing the edges out of nodes whose distance changed since they were last swept; any
+        # more passes than the standard algorithm would make mean there is a negative-weight
+        # cycle, which step 3 finds
         affected = {start_node}
-        changed = defaultdict(lambda: False)
-        while len(affected):
-            for u in ordering:
-                for _, v, weight in increasing_edges[u]:
-                    if u in affected or changed[v]:
-                        if distance[u] + weight < distance[v]:
-                            distance[v] = distance[u] + weight
-                            predecessor[v] = u
-                            changed[v] = True
-
-            for u in ordering[::-1]:
-                for _, v, weight in decreasing_edges[u]:
-                    if u in affected or changed[v]:
-                        if distance[u] + weight < distance[v]:
-                            distance[v] = distance[u] + weight
-                            predecessor[v] = u
-                            changed[v] = True
-
-            affected = {n for n in changed if changed[n]}
-            changed.clear()
+        for _ in range(len(self.nodes) - 1):
+            changed = set()
+            for sweep, edges in (
+                (ordering, increasing_edges),
+                (reversed(ordering), decreasing_edges),
+            ):
+                for u in sweep:
+                    if u in affected or u in changed:
+                        for v, weight in edges[u]:
+                            if distance[u] + weight < distance[v]:
+                                distance[v] = distance[u] + weight
+                                predecessor[v] = u
+                                changed.add(v)
+
+            if not changed:
+                break
+            affected = changed
 
         # Step 3: check for negative-weight cycles
-        for u, v, weight in self.get_all_connections():
+        for u, v, weight in self.edge_list():
             if distance[u] + weight < distance[v]:
                 predecessor[v] = u
                 # A negative cycle exists;
@@ -770,6 +2001,134 @@ class WeightedMatrixGraph(MatrixGraph):
 
         return distance[end_node], path
 
+    def floyd_warshall(self):
+        """
+        Finds the shortest paths between every pair of nodes, using the Floyd-Warshall algorithm
+            https://en.wikipedia.org/wiki/Floyd%E2%80%93Warshall_algorithm
+
+        Returns:
+            tuple: The distance matrix and the successor matrix, as lists of rows in the same
+            order as nodes; distance[i][j] is the length of the shortest path from node i to
+            node j (infinite if there isn't one) and successor[i][j] the node following node i
+            along it (None if there isn't one), for passing on to
+            reconstruct_floyd_warshall_path.
+
+        Raises:
+            ValueError: If the graph contains a negative-weight cycle, along with the nodes
+            whose shortest path back to themselves is negative.
+        """
+        nodes = self.nodes
+        position = {node: index for index, node in enumerate(nodes)}
+        size = len(nodes)
+
+        distance = [[float("inf")] * size for _ in range(size)]
+        successor = [[None] * size for _ in range(size)]
+        for index, node in enumerate(nodes):
+            distance[index][index] = 0
+            successor[index][index] = node
+        for u, v, weight in self.edge_list():
+            i, j = position[u], position[v]
+            if weight < distance[i][j]:
+                distance[i][j] = weight
+                successor[i][j] = v
+
+        # allow the paths to go through each node in turn
+        for k in range(size):
+            through_k = distance[k]
+            for i in range(size):
+                to_k = distance[i][k]
+                if to_k == float("inf"):
+                    continue
+
+                row, next_row, next_k = distance[i], successor[i], successor[i][k]
+                for j, from_k in enumerate(through_k):
+                    if to_k + from_k < row[j]:
+                        row[j] = to_k + from_k
+                        next_row[j] = next_k
+
+        ncycle = [node for index, node in enumerate(nodes) if distance[index][index] < 0]
+        if len(ncycle) > 0:
+            raise ValueError("Graph contains a negative-weight cycle", ncycle)
+
+        return distance, successor
+
+    def johnson(self):
+        """
+        Finds the shortest paths between every pair of nodes using Johnson's algorithm, which
+        suits sparse graphs with negative weights: a single Bellman-Ford pass, from a virtual
+        source joined to every node by a zero-weight edge, gives each node a potential that
+        makes every edge non-negative once reweighted, then Dijkstra is run from each node in
+        turn over the reweighted edges.
+            https://en.wikipedia.org/wiki/Johnson%27s_algorithm
+
+        Returns:
+            list: The distance matrix, as a list of rows in the same order as nodes;
+            distance[i][j] is the length of the shortest path from node i to node j (infinite if
+            there isn't one).
+
+        Raises:
+            ValueError: If the graph contains a negative-weight cycle, along with the cycle.
+        """
+        nodes = self.nodes
+
+        # Bellman-Ford from the virtual source, which puts every node at zero to begin with;
+        # counting the virtual source, there is one more node than in the graph, so one more
+        # pass may be needed
+        potential = dict.fromkeys(nodes, 0)
+        predecessor = defaultdict(lambda: None)
+        for _ in range(len(nodes)):
+            changed = False
+            for u, v, weight in self.edge_list():
+                if potential[u] + weight < potential[v]:
+                    potential[v] = potential[u] + weight
+                    predecessor[v] = u
+                    changed = True
+            if not changed:
+                break
+
+        # check for negative-weight cycles, once, before any of the Dijkstra runs
+        for u, v, weight in self.edge_list():
+            if potential[u] + weight < potential[v]:
+                predecessor[v] = u
+
+                visited = defaultdict(lambda: False)
+                visited[v] = True
+                while not visited[u]:
+                    visited[u] = True
+                    u = predecessor[u]
+
+                ncycle = [u]
+                v = predecessor[u]
+                while v != u:
+                    ncycle.append(v)
+                    v = predecessor[v]
+
+                raise ValueError("Graph contains a negative-weight cycle", ncycle)
+
+        # then Dijkstra from every node, undoing the reweighting on the way out
+        position = {node: index for index, node in enumerate(nodes)}
+        distance = [[float("inf")] * len(nodes) for _ in nodes]
+        for row, node in zip(distance, nodes):
+            for to_node, (cost, _) in self.dijkstra(node, potential=potential):
+                row[position[to_node]] = cost - potential[node] + potential[to_node]
+
+        return distance
+
+    def reconstruct_floyd_warshall_path(self, successor, from_node, to_node):
+        """
+        Follows the successor matrix returned by floyd_warshall to give the shortest path
+        between two nodes, in order from the first to the second; empty if there is none.
+        """
+        position = {node: index for index, node in enumerate(self.nodes)}
+        to_index = position[to_node]
+        if successor[position[from_node]][to_index] is None:
+            return []
+
+        path = [from_node]
+        while path[-1] != to_node:
+            path.append(successor[position[path[-1]]][to_index])
+        return path
+
     def prims_mst(self):
         """
         Finds the minimum spanning tree of a fully connected graph, using Prim's algorithm
@@ -778,14 +2137,26 @@ class WeightedMatrixGraph(MatrixGraph):
         key_values = defaultdict(lambda: float("inf"))
         parents = defaultdict(lambda: None)
 
-        key_values[choice(self.nodes)] = 0  # starting node
+        start_node = choice(self.nodes)
+        key_values[start_node] = 0
+
+        # candidates are queued by key, then by position in self.nodes to break ties; a node may
+        # be queued more than once as its key drops, and any entry for a node already in the MST
+        # is simply skipped when it surfaces
+        positions = {node: position for position, node in enumerate(self.nodes)}
+        queue = [(0, positions[start_node], start_node)]
+        # if the queue runs dry the graph is disconnected, so carry on from the first node not
+        # yet reached
+        unreached = iter(self.nodes)
 
         results = []
         for _ in range(len(self)):
-            next_cheapest = min(
-                (node for node in self.nodes if not in_mst[node]),
-                key=lambda node: key_values[node],
-            )
+            while len(queue) > 0 and in_mst[queue[0][2]]:
+                heappop(queue)
+            if len(queue) > 0:
+                _, _, next_cheapest = heappop(queue)
+            else:
+                next_cheapest = next(node for node in unreached if not in_mst[node])
 
             in_mst[next_cheapest] = True
 
@@ -798,56 +2169,432 @@ class WeightedMatrixGraph(MatrixGraph):
                     ]
                 )
 
-            for neighbour, weight in self.get_connections(next_cheapest):
+            for neighbour, weight in self.neighbours(next_cheapest):
                 if 0 < weight < key_values[neighbour] and not in_mst[neighbour]:
                     key_values[neighbour] = weight
                     parents[neighbour] = next_cheapest
+                    heappush(queue, (weight, positions[neighbour], neighbour))
 
         return results
 
     def kruskals_mst(self):
-        def find(parents, node):
-            if parents[node] is None:
-                return node
-
-            return find(parents, parents[node])
-
-        def union(parents, ranks, node1, node2):
-            node1_root = find(parents, node1)
-            node2_root = find(parents, node2)
-
-            if ranks[node1_root] < ranks[node2_root]:
-                parents[node1_root] = node2_root
-            elif ranks[node1_root] > ranks[node2_root]:
-                parents[node2_root] = node1_root
-            else:
-                parents[node2_root] = node1_root
-                ranks[node1_root] += 1
-
         results = []  # MST
 
         # create a sorted collection of edges by weight from smallest up
         edges = {}
-        for node in self.nodes:
-            for neighbour, weight in self.get_connections(node):
-                if (node, neighbour) not in edges and (
-                    (neighbour, node) not in edges or edges[(neighbour, node)] != weight
-                ):
-                    edges[(node, neighbour)] = weight
+        for node, neighbour, weight in self.edge_list():
+            if (node, neighbour) not in edges and (
+                (neighbour, node) not in edges or edges[(neighbour, node)] != weight
+            ):
+                edges[(node, neighbour)] = weight
 
-        parents = defaultdict(lambda: None)
-        ranks = defaultdict(lambda: 0)
+        components = DisjointSet(self.nodes)
 
         for (edge1, edge2), weight in sorted(edges.items(), key=lambda i: i[1]):
-            parent1 = find(parents, edge1)
-            parent2 = find(parents, edge2)
-            if parent1 != parent2:
+            if components.union(edge1, edge2):
                 results.append(((edge1, edge2), weight))
-                union(parents, ranks, parent1, parent2)
 
         return results
 
 
+class SparseMatrixGraph(MatrixGraph):
+    """
+    an unweighted, (possibly) directional graph, stored in compressed sparse row (CSR) form
+    rather than as a full matrix - row i of the matrix is held as the sorted column indices
+    self._targets[self._offsets[i]:self._offsets[i + 1]], with the matching edge values at the
+    same positions in self._values. Memory, and the cost of scanning a node's neighbours, is
+    therefore proportional to the number of edges rather than the square of the nodes.
+
+    Edge changes are collected in a small per-row overlay and merged into the packed arrays
+    the next time a whole row is read, so building up a graph an edge at a time stays cheap.
+    """
+
+    def _load(self, matrix):
+        self._offsets = array("l", [0])
+        self._targets = array("l")
+        self._values = []
+        self._pending = {}
+        for row in matrix[: len(self._slots)]:
+            for to_index, value in enumerate(row):
+                if value:
+                    self._targets.append(to_index)
+                    self._values.append(value)
+            self._offsets.append(len(self._targets))
+
+    @property
+    def matrix(self):
+        """A full (list of rows) copy of the adjacency matrix, eg for saving or display."""
+        live = self._live_slots()
+        positions = {index: position for position, index in enumerate(live)}
+        rows = []
+        for index in live:
+            row = [False for n in range(len(live))]
+            for to_index, value in self._row_items(index):
+                row[positions[to_index]] = value
+            rows.append(row)
+        return rows if len(rows) > 0 else [[]]
+
+    def _flush(self):
+        """Merges any pending edge changes into the packed arrays."""
+        offsets = array("l", [0])
+        targets = array("l")
+        values = []
+        for index in range(len(self._offsets) - 1):
+            start, end = self._offsets[index], self._offsets[index + 1]
+            changes = self._pending.get(index)
+            if changes is None:
+                targets.extend(self._targets[start:end])
+                values.extend(self._values[start:end])
+            else:
+                row = dict(zip(self._targets[start:end], self._values[start:end]))
+                row.update(changes)
+                for to_index in sorted(row):
+                    if row[to_index]:
+                        targets.append(to_index)
+                        values.append(row[to_index])
+            offsets.append(len(targets))
+
+        self._offsets = offsets
+        self._targets = targets
+        self._values = values
+        self._pending = {}
+
+    def _repack(self, rows, columns):
+        """
+        Rebuilds the packed arrays from the given rows (old slot numbers, in their new order,
+        with None for a row to be emptied), keeping only the columns in the old -> new mapping.
+        """
+        if len(self._pending) > 0:
+            self._flush()
+
+        offsets = array("l", [0])
+        targets = array("l")
+        values = []
+        for from_index in rows:
+            if from_index is not None:
+                row = []
+                for pos in range(self._offsets[from_index], self._offsets[from_index + 1]):
+                    to_index = columns.get(self._targets[pos])
+                    if to_index is not None:
+                        row.append((to_index, self._values[pos]))
+                # the new numbering needn't follow the old, but each row's targets stay sorted
+                row.sort(key=itemgetter(0))
+                targets.extend(to_index for to_index, value in row)
+                values.extend(value for to_index, value in row)
+            offsets.append(len(targets))
+
+        self._offsets = offsets
+        self._targets = targets
+        self._values = values
+
+    def _reserve(self, size):
+        while len(self._offsets) <= size:
+            self._offsets.append(self._offsets[-1])
+
+    def _clear_slot(self, index):
+        slots = range(len(self._offsets) - 1)
+        self._repack(
+            [from_index if from_index != index else None for from_index in slots],
+            {to_index: to_index for to_index in slots if to_index != index},
+        )
+
+    def _compact(self, live):
+        self._repack(live, {index: position for position, index in enumerate(live)})
+
+    def _get_edge(self, from_index, to_index):
+        changes = self._pending.get(from_index)
+        if changes is not None and to_index in changes:
+            return changes[to_index]
+
+        end = self._offsets[from_index + 1]
+        pos = bisect_left(self._targets, to_index, self._offsets[from_index], end)
+        if pos < end and self._targets[pos] == to_index:
+            return self._values[pos]
+        return False
+
+    def _set_edge(self, from_index, to_index, value):
+        self._pending.setdefault(from_index, {})[to_index] = value if value else False
+
+    def _set_edges(self, from_indices, to_indices, values):
+        pending = self._pending
+        for from_index, to_index, value in zip(from_indices, to_indices, values):
+            pending.setdefault(from_index, {})[to_index] = value if value else False
+
+    def _row_items(self, index):
+        if len(self._pending) > 0:
+            self._flush()
+
+        # walk the packed arrays in place, rather than slicing copies of them; later flushes
+        # swap in new arrays, so holding on to these ones keeps a part-consumed row consistent
+        targets, values = self._targets, self._values
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return ((targets[pos], values[pos]) for pos in range(start, end))
+
+
+class WeightedSparseMatrixGraph(SparseMatrixGraph, WeightedMatrixGraph):
+    """a weighted, (maybe) directional graph, stored in compressed sparse row (CSR) form"""
+
+
+class NumpyWeightedMatrixGraph(WeightedMatrixGraph):
+    """
+    a weighted, (maybe) directional graph, stored as a contiguous NumPy float64 matrix of
+    weights alongside a boolean matrix marking which edges are present. Both are allocated with
+    spare capacity, doubled whenever it runs out, so adding a node doesn't touch every row.
+
+    Neighbour lookups, and the relaxation steps of Dijkstra and Bellman-Ford, work on whole rows
+    (or the whole edge list) at a time. Requires the optional numpy dependency.
+    """
+
+    def __init__(self, undirected=False):
+        if np is None:
+            raise ImportError("NumpyWeightedMatrixGraph requires numpy to be installed")
+        super().__init__(undirected)
+
+    def _allocate(self, capacity):
+        weights = np.zeros((capacity, capacity), dtype=np.float64)
+        present = np.zeros((capacity, capacity), dtype=np.bool_)
+        return weights, present
+
+    def _load(self, matrix):
+        size = len(self._slots)
+        self._weights, self._present = self._allocate(max(size, 8))
+        if size > 0:
+            values = np.array(
+                [[float(value) if value else 0.0 for value in row] for row in matrix[:size]],
+                dtype=np.float64,
+            )
+            self._weights[:size, :size] = values
+            self._present[:size, :size] = values != 0
+
+    @property
+    def matrix(self):
+        """A full (list of rows) copy of the adjacency matrix, eg for saving or display."""
+        live = np.array(self._live_slots(), dtype=np.intp)
+        live = np.ix_(live, live)
+        rows = [
+            [
+                self._plain(weight) if present else False
+                for weight, present in zip(weights, presents)
+            ]
+            for weights, presents in zip(
+                self._weights[live].tolist(), self._present[live].tolist()
+            )
+        ]
+        return rows if len(rows) > 0 else [[]]
+
+    @staticmethod
+    def _plain(weight):
+        """
+        A weight read back out of the float64 storage, as the other backends hold it: whole
+        numbers as ints, so eg 3 rather than 3.0 is displayed and saved.
+        """
+        return int(weight) if weight.is_integer() else weight
+
+    def _reserve(self, size):
+        capacity = len(self._present)
+        if size > capacity:
+            weights, present = self._allocate(max(size, capacity * 2))
+            weights[:capacity, :capacity] = self._weights
+            present[:capacity, :capacity] = self._present
+            self._weights, self._present = weights, present
+
+    def _clear_slot(self, index):
+        for store in (self._weights, self._present):
+            store[index, :] = 0
+            store[:, index] = 0
+
+    def _compact(self, live):
+        size = len(live)
+        live = np.ix_(np.array(live, dtype=np.intp), np.array(live, dtype=np.intp))
+        weights, present = self._allocate(max(size, 8))
+        weights[:size, :size] = self._weights[live]
+        present[:size, :size] = self._present[live]
+        self._weights, self._present = weights, present
+
+    def _get_edge(self, from_index, to_index):
+        if self._present[from_index, to_index]:
+            return self._plain(self._weights[from_index, to_index].item())
+        return False
+
+    def _set_edge(self, from_index, to_index, value):
+        self._present[from_index, to_index] = bool(value)
+        self._weights[from_index, to_index] = value if value else 0.0
+
+    def _set_edges(self, from_indices, to_indices, values):
+        edges = (np.array(from_indices, dtype=np.intp), np.array(to_indices, dtype=np.intp))
+        weights = np.array([value if value else 0.0 for value in values], dtype=np.float64)
+        self._present[edges] = weights != 0
+        self._weights[edges] = weights
+
+    def _row_items(self, index):
+        to_indices = np.nonzero(self._present[index, : len(self._slots)])[0]
+        weights = self._weights[index, to_indices].tolist()
+        return zip(to_indices.tolist(), map(self._plain, weights))
+
+    def _edge_arrays(self):
+        """
+        Returns parallel arrays of from-index, to-index and weight, for every edge in the graph.
+        """
+        size = len(self._slots)
+        from_indices, to_indices = np.nonzero(self._present[:size, :size])
+        return from_indices, to_indices, self._weights[from_indices, to_indices]
+
+    def iter_edge_indices(self):
+        from_indices, to_indices, weights = self._edge_arrays()
+        weights = map(self._plain, weights.tolist())
+        return zip(from_indices.tolist(), to_indices.tolist(), weights)
+
+    def dijkstra(self, start_node, end_node=None, potential=None):
+        size = len(self._slots)
+        distance = np.full(size, np.inf)
+        previous = np.full(size, -1, dtype=np.intp)
+
+        # the potential of each slot, for reweighting the edges (all zero, leaving them as they
+        # are, if not given)
+        offsets = np.zeros(size)
+        if potential is not None:
+            for node, value in potential.items():
+                offsets[self._indices[node]] = value
+
+        start_index = self._indices[start_node]
+        end_index = self._indices.get(end_node)
+        distance[start_index] = 0
+
+        queue = IndexedPriorityQueue()
+        queue.push(start_index, 0.0)
+        while len(queue) > 0:
+            current_cost, current_index = queue.pop()
+
+            if current_index == end_index:
+                break
+
+            # relax the whole row in one go, then only queue the neighbours that improved
+            to_indices = np.nonzero(self._present[current_index, :size])[0]
+            costs = (
+                current_cost
+                + self._weights[current_index, to_indices]
+                + offsets[current_index]
+                - offsets[to_indices]
+            )
+            improved = costs < distance[to_indices]
+            to_indices, costs = to_indices[improved], costs[improved]
+            distance[to_indices] = costs
+            previous[to_indices] = current_index
+            for cost, to_index in zip(costs.tolist(), to_indices.tolist()):
+                queue.push(to_index, cost)
+
+        if end_node is None:
+            return {
+                self._slots[index]: [
+                    distance[index].item(),
+                    self._slots[previous[index]] if previous[index] >= 0 else None,
+                ]
+                for index in np.nonzero(np.isfinite(distance))[0].tolist()
+            }.items()
+
+        path = []
+        current = end_index
+        while current != start_index:
+            path.append(self._slots[current])
+            current = previous[current]
+        path.append(start_node)
+        return path[::-1]
+
+    def bellman_ford(self, start_node, end_node=None):
+        """
+        As WeightedMatrixGraph.bellman_ford, but each pass relaxes every edge at once. Where
+        several edges improve the same node in a pass, the cheapest of them wins.
+        """
+        size = len(self._slots)
+        from_indices, to_indices, weights = self._edge_arrays()
+
+        distance = np.full(size, np.inf)
+        previous = np.full(size, -1, dtype=np.intp)
+        distance[self._indices[start_node]] = 0
+
+        for _ in range(len(self) - 1):
+            costs = distance[from_indices] + weights
+            improved = costs < distance[to_indices]
+            if not improved.any():
+                break
+
+            froms, tos, costs = from_indices[improved], to_indices[improved], costs[improved]
+            order = np.lexsort((costs, tos))
+            _, first = np.unique(tos[order], return_index=True)
+            cheapest = order[first]
+            distance[tos[cheapest]] = costs[cheapest]
+            previous[tos[cheapest]] = froms[cheapest]
+
+        # convert back to the node-keyed form that the other implementations use
+        node_distance = defaultdict(lambda: float("inf"))
+        predecessor = defaultdict(lambda: None)
+        for index in np.nonzero(np.isfinite(distance))[0].tolist():
+            node_distance[self._slots[index]] = distance[index].item()
+            if previous[index] >= 0:
+                predecessor[self._slots[index]] = self._slots[previous[index]]
+
+        # check for negative-weight cycles
+        improved = distance[from_indices] + weights < distance[to_indices]
+        if improved.any():
+            position = np.argmax(improved)
+            u = self._slots[from_indices[position]]
+            v = self._slots[to_indices[position]]
+            predecessor[v] = u
+
+            visited = {v}
+            while u not in visited:
+                visited.add(u)
+                u = predecessor[u]
+
+            ncycle = [u]
+            v = predecessor[u]
+            while v != u:
+                ncycle.append(v)
+                v = predecessor[v]
+
+            raise ValueError("Graph contains a negative-weight cycle", ncycle)
+
+        if end_node is None:
+            return node_distance, predecessor
+
+        current = end_node
+        path = [current]
+        while current != start_node:
+            current = predecessor[current]
+            path = [current] + path
+
+        return node_distance[end_node], path
+
+    def floyd_warshall(self):
+        """
+        As WeightedMatrixGraph.floyd_warshall, but each pass updates the whole distance matrix
+        at once, broadcasting the column of distances to node k against its row onwards.
+        """
+        nodes = self.nodes
+        size = len(nodes)
+        live = np.array(self._live_slots(), dtype=np.intp)
+        live = np.ix_(live, live)
+
+        distance = np.where(self._present[live], self._weights[live], np.inf)
+        diagonal = np.arange(size)
+        distance[diagonal, diagonal] = np.minimum(distance[diagonal, diagonal], 0)
+        successor = np.where(np.isfinite(distance), diagonal, -1)
+
+        for k in range(size):
+            through_k = distance[:, k, None] + distance[None, k, :]
+            improved = through_k < distance
+            np.minimum(distance, through_k, out=distance)
+            successor = np.where(improved, successor[:, k, None], successor)
+
+        ncycle = [nodes[index] for index in np.nonzero(np.diagonal(distance) < 0)[0].tolist()]
+        if len(ncycle) > 0:
+            raise ValueError("Graph contains a negative-weight cycle", ncycle)
+
+        # -1 (no successor) picks out the None tacked onto the end of the node names
+        names = np.array(nodes + [None], dtype=object)
+        return distance.tolist(), names[successor].tolist()
+
+
 if __name__ == "__main__":
 
     def test_tree():
@@ -886,6 +2633,17 @@ if __name__ == "__main__":
 
         t.pre_traverse(lambda n: print(n.value, end=","))
         print()
+
+        for n in range(0, 100, 3):
+            t.remove(n)
+        assert 3 not in t and 4 in t
+        t.in_traverse(lambda n: print(n.value, end=","))
+        print()
+
+        t = RedBlackTree.from_sorted(range(100))
+        assert 42 in t
+        t.pre_traverse(lambda n: print(n.value, end=","))
+        print()
         print("...done")
 
     def test_list_graph():
@@ -908,6 +2666,8 @@ if __name__ == "__main__":
         print("C" in g)
         print(g.is_connected("A", "C"))
         print(g.is_connected("B", "D"))
+        print("depth first from A: ", ",".join(g.depth_first("A")))
+        print("breadth first from A: ", ",".join(g.breadth_first("A")))
         print("...done")
 
     def test_matrix_graph():
@@ -1037,6 +2797,96 @@ if __name__ == "__main__":
             print("Connection:", c)
         # print(g.matrix)
 
+    def test_batch_edges():
+        print("Testing batch edges...")
+        edges = [("A", "B", 5), ("B", "A", 8), ("B", "C", 2), ("C", "B", 0)]
+        for undirected in (False, True):
+            batched = WeightedMatrixGraph(undirected)
+            sequential = WeightedMatrixGraph(undirected)
+            for node in ("A", "B", "C"):
+                batched.add_node(node)
+                sequential.add_node(node)
+            batched.add_edges_from(edges)
+            for from_node, to_node, weight in edges:
+                sequential.add_edge(from_node, to_node, weight)
+            # a later edge between the same nodes wins both ways, however the edges are added
+            assert batched.matrix == sequential.matrix, (batched.matrix, sequential.matrix)
+            print("undirected" if undirected else "directed", batched.matrix)
+        print("...done")
+
+    def test_node_order():
+        print("Testing node order...")
+        for kind in (MatrixGraph, SparseMatrixGraph):
+            g = kind(True)
+            for node in ("A", "B", "C"):
+                g.add_node(node)
+            g.add_edge("A", "B")
+            g.add_edge("B", "C", undirected=False)
+            g.delete_node("A")
+            g.add_node("D")
+            g.add_edge("D", "C")
+            # D reuses A's slot, but is still listed (and laid out) after the nodes before it
+            assert g.nodes == ["B", "C", "D"], g.nodes
+            expected = [[False, 1, False], [False, False, 1], [False, 1, False]]
+            assert g.matrix == expected, g.matrix
+            g.compact()
+            assert g.nodes == ["B", "C", "D"] and g.matrix == expected, (g.nodes, g.matrix)
+            assert g.is_connected("D", "C") and not g.is_connected("C", "B")
+            print(kind.__name__, g.nodes, g.matrix)
+
+        g = MatrixGraph(True)
+        properties = GraphProperties(g)
+        for node in ("A", "B"):
+            g.add_node(node)
+            properties.node_added(node)
+        g.delete_node("A")
+        properties.removed()
+        g.add_node("C")
+        properties.node_added("C")
+        g.add_edge("B", "C", undirected=False)
+        properties.edge_added("B", "C")
+        # B is still the first node, so the tree is walked from it
+        assert properties.is_tree()
+        print("...done")
+
+    def test_graph_properties():
+        print("Testing graph properties...")
+        g = MatrixGraph(True)
+        properties = GraphProperties(g)
+        g.add_node("A")
+        g.add_node("B")
+        g.add_edge("B", "A", undirected=False)
+        properties.edge_added("B", "A")
+        # only B leads to A, so walking from A (the first node) never reaches B
+        assert not properties.is_tree()
+        g.add_node("C")
+        properties.node_added("C")
+        g.add_edge("A", "B", undirected=False)
+        properties.edge_added("A", "B")
+        g.add_edge("A", "C")
+        properties.edge_added("A", "C")
+        properties.edge_added("C", "A")
+        assert properties.is_tree()
+        g.add_edge("B", "C", undirected=False)
+        properties.edge_added("B", "C")
+        assert not properties.is_tree()
+        print("...done")
+
+    def test_coordinate_heuristic():
+        print("Testing coordinate heuristic...")
+        g = WeightedMatrixGraph()
+        g.add_node("A")
+        g.add_node("B")
+        g.add_node("C")
+        g.add_edge("A", "B", 10)
+        g.add_edge("B", "C", 4)
+        # as from the canvas, where a node that isn't drawn has no coordinates
+        positions = {"A": (0, 0), "B": (3, 4), "C": None}
+        h = CoordinateHeuristic.consistent_with(g, positions, "euclidean")
+        assert h("A", "B") == 10
+        assert h("A", "C") == 0 and h("C", "B") == 0
+        print("...done")
+
     def test_bellman_ford():
         g = WeightedMatrixGraph()
         g.add_node("A")
@@ -1066,6 +2916,16 @@ if __name__ == "__main__":
         average = timeit(lambda: g.randomized_bellman_ford("A", "E"), number=1000)
         print("Total shortest randomized bellman-ford path from A to E:", average)
 
+        distance, successor = g.floyd_warshall()
+        print("Floyd-Warshall distances:")
+        print([print(row) for row in distance])
+        path = g.reconstruct_floyd_warshall_path(successor, "A", "E")
+        print("Floyd-Warshall path from A to E:", path)
+        print("Johnson distances:")
+        print([print(row) for row in g.johnson()])
+        average = timeit(lambda: g.floyd_warshall(), number=1000)
+        print("Total all-pairs floyd-warshall paths:", average)
+
     def test_mst_algorithms():
         g = WeightedMatrixGraph(True)
         g.add_node("A")
@@ -1112,5 +2972,9 @@ if __name__ == "__main__":
     # test_matrix_graph()
     # test_graph_connections()
     # test_weighted_graph()
+    test_batch_edges()
+    test_node_order()
+    test_graph_properties()
+    test_coordinate_heuristic()
     test_bellman_ford()
     # test_mst_algorithms()
@@ -4,7 +4,14 @@ import ttkbootstrap.dialogs as dialogs
 
 from .state_model import StateModel
 from .traversal_frames import BreadthFirstFrame, DepthFirstFrame, TreeTraversalFrame
-from .optimisation_frames import DijkstraShortestPathFrame, AStarShortestPathFrame, BellmanFordShortestPathFrame
+from .optimisation_frames import (
+    DijkstraShortestPathFrame,
+    BidirectionalDijkstraShortestPathFrame,
+    AStarShortestPathFrame,
+    BellmanFordShortestPathFrame,
+    RandomizedBellmanFordShortestPathFrame,
+    FloydWarshallFrame,
+)
 from .spanning_frames import PrimsSpanningFrame, KruskalsSpanningFrame
 
 
@@ -21,8 +28,11 @@ class UsageControlsFrame(ttk.Frame):
 
     WEIGHTED_ALGOCHOICES = UNWEIGHTED_ALGOCHOICES + [
         "Dijkstra's Shortest Path",
+        "Bidirectional Dijkstra's Shortest Path",
         "A* Shortest Path",
         "Bellman-Ford Shortest Path",
+        "Randomized Bellman-Ford Shortest Path",
+        "Floyd-Warshall All-Pairs Shortest Paths",
         "Prim's Minimum Spanning Tree",
         "Kruskal's Minimum Spanning Tree",
     ]
@@ -46,7 +56,11 @@ class UsageControlsFrame(ttk.Frame):
         )
         self.__from = ttk.StringVar(name="FROM_VAR")
         self.__to = ttk.StringVar(name="TO_VAR")
+        self.__heuristic = ttk.StringVar(
+            value=StateModel().get_heuristic_kinds()[0].capitalize()
+        )
         self.__speed = ttk.IntVar(value=5)
+        self.__replay = ttk.BooleanVar(value=StateModel().is_replaying_results())
         self.__timer_token = None
         self.__trace_frame = None
 
@@ -114,6 +128,25 @@ class UsageControlsFrame(ttk.Frame):
             ),
         )
 
+        # only A* takes a heuristic, so the choice of one is only shown while it's selected
+        heuristic_label = ttk.Label(nodes_frame, text="Heuristic:", anchor=tk.E)
+        heuristic_combo = ttk.Combobox(
+            nodes_frame,
+            textvariable=self.__heuristic,
+            values=[kind.capitalize() for kind in StateModel().get_heuristic_kinds()],
+            state="readonly",
+        )
+
+        def show_heuristic(*args):
+            if self.__algochoice.get() == "A* Shortest Path":
+                heuristic_label.grid(row=4, column=0, padx=(0, 3), pady=(3, 0))
+                heuristic_combo.grid(row=4, column=1, sticky=tk.NSEW, pady=(3, 0))
+            else:
+                heuristic_label.grid_remove()
+                heuristic_combo.grid_remove()
+
+        self.__algochoice.trace_add("write", show_heuristic)
+
         self.__step_button = ttk.Button(
             self, text="Step Trace", command=self.__trace_step
         )
@@ -123,7 +156,13 @@ class UsageControlsFrame(ttk.Frame):
         )
         self.__timed_button.grid(sticky=tk.NSEW, pady=(3, 3))
         self.__timed_speed = ttk.Scale(self, from_=1, to=5, variable=self.__speed)
-        self.__timed_speed.grid(sticky=tk.NSEW, pady=(3, 15))
+        self.__timed_speed.grid(sticky=tk.NSEW, pady=(3, 3))
+        ttk.Checkbutton(
+            self,
+            text="Replay Cached Results",
+            variable=self.__replay,
+            command=lambda: StateModel().set_replay_results(self.__replay.get()),
+        ).grid(sticky=tk.NSEW, pady=(3, 15))
 
         self.columnconfigure(0, weight=1)
 
@@ -191,10 +230,26 @@ class UsageControlsFrame(ttk.Frame):
                         message='At least the "From" node is required to trace Dijkstra\'s shortest path',
                     )
 
+            case "Bidirectional Dijkstra's Shortest Path":
+                if from_given and to_given:
+                    self.__trace_frame = BidirectionalDijkstraShortestPathFrame(
+                        self, self.__canvas_frame, from_node, to_node
+                    )
+                else:
+                    dialogs.Messagebox.show_error(
+                        title="Required Nodes",
+                        message='Both "From" and "To" nodes are required to trace '
+                        "bidirectional Dijkstra's shortest path",
+                    )
+
             case "A* Shortest Path":
                 if from_given and to_given:
                     self.__trace_frame = AStarShortestPathFrame(
-                        self, self.__canvas_frame, from_node, to_node
+                        self,
+                        self.__canvas_frame,
+                        from_node,
+                        to_node,
+                        self.__heuristic.get().lower(),
                     )
                 else:
                     dialogs.Messagebox.show_error(
@@ -213,6 +268,21 @@ class UsageControlsFrame(ttk.Frame):
                         message='At least the "From" node is required to trace the Bellman-Ford shortest path',
                     )
 
+            case "Randomized Bellman-Ford Shortest Path":
+                if from_given:
+                    self.__trace_frame = RandomizedBellmanFordShortestPathFrame(
+                        self, self.__canvas_frame, from_node, to_node
+                    )
+                else:
+                    dialogs.Messagebox.show_error(
+                        title="Required Node",
+                        message='At least the "From" node is required to trace the randomized '
+                        "Bellman-Ford shortest path",
+                    )
+
+            case "Floyd-Warshall All-Pairs Shortest Paths":
+                self.__trace_frame = FloydWarshallFrame(self, self.__canvas_frame)
+
             case "Prim's Minimum Spanning Tree":
                 self.__trace_frame = PrimsSpanningFrame(
                     self, self.__canvas_frame, from_node,
@@ -258,7 +328,7 @@ class UsageControlsFrame(ttk.Frame):
 
         if self.__trace_frame is not None:
             self.__trace_frame.grid(sticky=tk.NSEW, pady=(15, 0))
-            self.rowconfigure(5, weight=1)
+            self.rowconfigure(6, weight=1)
             return True
 
         return False
@@ -309,6 +379,7 @@ class UsageControlsFrame(ttk.Frame):
             self.__timed_button.configure(command=self.__reset_trace)
 
     def __reset_trace(self):
+        StateModel().set_representation_matrix()
         self.__canvas_frame.unhighlight_all_nodes()
         self.__canvas_frame.unhighlight_all_edges()
         self.__trace_frame.grid_remove()